@@ -0,0 +1,67 @@
+"""
+Synthetic fleet and ledger generator used by the benchmark and load-test
+tools. Output matches the layout FileHandler reads and writes.
+"""
+import random
+from datetime import datetime, timedelta
+
+from src.vehicle_rental_system.utils.file_handler import FileHandler
+
+BRANDS = {
+    "Car": [("Toyota", ["Corolla", "Camry", "RAV4", "Yaris"]),
+            ("Honda", ["Civic", "Accord", "CR-V"]),
+            ("Hyundai", ["Elantra", "Tucson", "Santa Fe"]),
+            ("Volkswagen", ["Golf", "Polo", "Tiguan"])],
+    "Bike": [("Yamaha", ["MT-07", "YZF-R3", "XSR700"]),
+             ("Honda", ["CB500F", "Africa Twin"]),
+             ("Kawasaki", ["Ninja 400", "Z900"])],
+    "Truck": [("Ford", ["F-150", "Ranger"]),
+              ("Isuzu", ["D-Max", "NPR"]),
+              ("Mercedes-Benz", ["Actros", "Atego"])],
+}
+BASE_PRICES = {"Car": (25000, 60000), "Bike": (5000, 12000), "Truck": (45000, 120000)}
+TYPE_WEIGHTS = {"Car": 6, "Bike": 3, "Truck": 1}
+
+
+def generate_vehicles(count, seed=0, rented_ratio=0.3):
+    """Return ``count`` vehicle records with ids 1..count."""
+    rng = random.Random(seed)
+    types = rng.choices(list(TYPE_WEIGHTS), weights=list(TYPE_WEIGHTS.values()), k=count)
+    vehicles = []
+    for vehicle_id, vtype in enumerate(types, start=1):
+        brand, models = rng.choice(BRANDS[vtype])
+        low, high = BASE_PRICES[vtype]
+        vehicles.append({
+            "vehicle_id": vehicle_id,
+            "type": vtype,
+            "brand": brand,
+            "model": rng.choice(models),
+            "base_price": float(rng.randrange(low, high, 100)),
+            "available": rng.random() >= rented_ratio,
+        })
+    return vehicles
+
+
+def generate_rentals(count, vehicle_count, seed=0, days_back=730):
+    """Return ``count`` chronologically ordered rental entries."""
+    rng = random.Random(seed + 1)
+    start = datetime.today() - timedelta(days=days_back)
+    step = timedelta(days=days_back) / max(count, 1)
+    rentals = []
+    for i in range(count):
+        days = rng.randint(1, 14)
+        rentals.append({
+            "renter": f"Renter {rng.randrange(count or 1)}",
+            "vehicle_id": rng.randint(1, max(vehicle_count, 1)),
+            "days": days,
+            "cost": float(rng.randrange(5000, 120000, 100) * days),
+            "date": (start + step * i).isoformat(),
+        })
+    return rentals
+
+
+def write_dataset(vehicle_count, rental_count=None, seed=0):
+    """Write vehicles.json/rentals.json into ./data (relative to the cwd)."""
+    rental_count = vehicle_count if rental_count is None else rental_count
+    FileHandler("vehicles.json").write(generate_vehicles(vehicle_count, seed))
+    FileHandler("rentals.json").write(generate_rentals(rental_count, vehicle_count, seed))
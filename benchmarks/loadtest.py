@@ -0,0 +1,277 @@
+"""
+Load-test harness driving VehicleManager/RentalService directly.
+
+Workers issue a weighted mix of rents, returns, listings and history reads
+against a synthetic dataset, choosing vehicle ids with a Zipf skew so a few
+"popular" vehicles see most of the traffic. With a target ``--rate`` latency
+is measured from each request's scheduled start, so queueing behind a slow
+call is counted instead of hidden::
+
+    python -m benchmarks.loadtest --vehicles 10000 --workers 8 --duration 20 --rate 200
+    python -m benchmarks.loadtest --workers 4 --mode processes --mix rent=50,return=50
+
+Thread workers share one service pair, which models a single-node
+deployment: RentalService serializes rents and returns itself and reads run
+concurrently with them. Lazy fleets keep an LRU cache that is not
+thread-safe, so in ``--manager-mode lazy`` every request takes a harness lock
+and the time spent waiting for it is reported separately. Process workers
+each get a private copy of the data directory and measure per-core capacity.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import accumulate
+
+from benchmarks.datagen import write_dataset
+from benchmarks.run import MANAGER_MODES, percentile, temp_workdir
+from src.vehicle_rental_system.services.rental_service import RentalService
+from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
+
+DEFAULT_MIX = "rent=30,return=25,list=35,history=10"
+OPERATIONS = ("rent", "return", "list", "history")
+
+
+def parse_mix(spec):
+    """Parse ``rent=30,return=25,...`` into (operations, weights)."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} in mix")
+        weights[name] = float(weight)
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("mix needs at least one positive weight")
+    return list(weights), list(weights.values())
+
+
+class ZipfSampler:
+    """Draw ids 1..n with P(rank k) ~ 1/k^s; ranks are shuffled onto ids."""
+    def __init__(self, n, s, rng):
+        self.rng = rng
+        self.cumulative = list(accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+        self.ids = list(range(1, n + 1))
+        rng.shuffle(self.ids)
+
+    def sample(self):
+        target = self.rng.random() * self.cumulative[-1]
+        return self.ids[bisect_left(self.cumulative, target)]
+
+
+def classify(operation, result):
+    """Map a service result message onto ok / conflict / error."""
+    if operation == "rent":
+        if "successfully rented" in result:
+            return "ok"
+        return "conflict" if "already rented" in result else "error"
+    if operation == "return":
+        if "returned successfully" in result:
+            return "ok"
+        return "conflict" if "not currently rented" in result else "error"
+    return "ok"
+
+
+def run_worker(config, worker_id, services=None, lock=None):
+    """
+    Issue requests until the deadline or op budget is reached. Returns raw
+    latencies and outcome counts per operation. Builds its own services from
+    ./data when none are shared.
+    """
+    if services is None:
+        vm = VehicleManager(**MANAGER_MODES[config["manager_mode"]])
+        rs = RentalService(vm)
+    else:
+        vm, rs = services
+
+    rng = random.Random(config["seed"] * 1000 + worker_id)
+    sampler = ZipfSampler(config["vehicles"], config["zipf"], rng)
+    operations, weights = config["operations"], config["weights"]
+    interval = config["workers"] / config["rate"] if config["rate"] else 0.0
+
+    latencies = {op: [] for op in operations}
+    lock_waits = {op: [] for op in operations}
+    outcomes = {op: {"ok": 0, "conflict": 0, "error": 0} for op in operations}
+    start = time.perf_counter()
+    deadline = start + config["duration"]
+    budget = config["ops_per_worker"]
+    scheduled = start
+    done = 0
+
+    while (budget is None or done < budget) and time.perf_counter() < deadline:
+        if interval:
+            # latency counts from the slot the request was due to be sent at,
+            # so falling behind schedule shows up in the tail
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            began = scheduled
+            scheduled += interval
+        else:
+            began = time.perf_counter()
+
+        operation = rng.choices(operations, weights)[0]
+        try:
+            if lock is None:
+                result = perform(operation, vm, rs, rng, sampler, worker_id)
+            else:
+                waiting = time.perf_counter()
+                with lock:
+                    lock_waits[operation].append(time.perf_counter() - waiting)
+                    result = perform(operation, vm, rs, rng, sampler, worker_id)
+            outcome = classify(operation, result)
+        except Exception:
+            outcome = "error"
+        latencies[operation].append(time.perf_counter() - began)
+        outcomes[operation][outcome] += 1
+        done += 1
+
+    return {"latencies": latencies, "lock_waits": lock_waits, "outcomes": outcomes,
+            "elapsed": time.perf_counter() - start}
+
+
+def perform(operation, vm, rs, rng, sampler, worker_id):
+    """Issue one request of the given kind and return the service's result."""
+    if operation == "rent":
+        return rs.rent_vehicle(f"Load {worker_id}", sampler.sample(), rng.randint(1, 7))
+    if operation == "return":
+        return rs.return_vehicle(sampler.sample())
+    if operation == "list":
+        return vm.list_available()
+    return rs.get_rent_history()
+
+
+def _process_worker(config, worker_id, data_dir):
+    """Process-pool entry point: run against a private copy of the dataset."""
+    workdir = os.path.join(os.path.dirname(data_dir), f"worker-{worker_id}")
+    shutil.copytree(data_dir, os.path.join(workdir, "data"))
+    os.chdir(workdir)
+    return run_worker(config, worker_id)
+
+
+def merge(results):
+    """Combine per-worker results into one report."""
+    latencies, lock_waits, outcomes = {}, {}, {}
+    for result in results:
+        for op, samples in result["latencies"].items():
+            latencies.setdefault(op, []).extend(samples)
+        for op, samples in result["lock_waits"].items():
+            lock_waits.setdefault(op, []).extend(samples)
+        for op, counts in result["outcomes"].items():
+            merged = outcomes.setdefault(op, {"ok": 0, "conflict": 0, "error": 0})
+            for key, value in counts.items():
+                merged[key] += value
+
+    elapsed = max(r["elapsed"] for r in results)
+    rows = []
+    for op, samples in latencies.items():
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        waits = sorted(lock_waits.get(op, ()))
+        rows.append({
+            "operation": op,
+            "requests": len(ordered),
+            **outcomes[op],
+            "throughput_ops": len(ordered) / elapsed,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p90_ms": percentile(ordered, 90) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "p999_ms": percentile(ordered, 99.9) * 1000,
+            "max_ms": ordered[-1] * 1000,
+            # time spent queued on the harness lock (lazy mode only), included above
+            "lock_wait_p50_ms": percentile(waits, 50) * 1000 if waits else None,
+            "lock_wait_p99_ms": percentile(waits, 99) * 1000 if waits else None,
+        })
+    total = sum(row["requests"] for row in rows)
+    return {
+        "elapsed_s": elapsed,
+        "requests": total,
+        "throughput_ops": total / elapsed if elapsed else 0.0,
+        "errors": sum(row["error"] for row in rows),
+        "conflicts": sum(row["conflict"] for row in rows),
+        "operations": rows,
+    }
+
+
+def run(args):
+    operations, weights = args.mix
+    config = {
+        "vehicles": args.vehicles,
+        "workers": args.workers,
+        "rate": args.rate,
+        "duration": args.duration,
+        "ops_per_worker": -(-args.ops // args.workers) if args.ops else None,
+        "zipf": args.zipf,
+        "seed": args.seed,
+        "operations": operations,
+        "weights": weights,
+        "manager_mode": args.manager_mode,
+    }
+
+    with temp_workdir() as tmp:
+        write_dataset(args.vehicles, args.rentals, seed=args.seed)
+        if args.mode == "threads":
+            vm = VehicleManager(**MANAGER_MODES[args.manager_mode])
+            services = (vm, RentalService(vm))
+            lock = threading.Lock() if args.manager_mode == "lazy" else None
+            with ThreadPoolExecutor(args.workers) as pool:
+                futures = [pool.submit(run_worker, config, i, services, lock) for i in range(args.workers)]
+                results = [f.result() for f in futures]
+        else:
+            data_dir = os.path.join(tmp, "data")
+            with ProcessPoolExecutor(args.workers) as pool:
+                futures = [pool.submit(_process_worker, config, i, data_dir) for i in range(args.workers)]
+                results = [f.result() for f in futures]
+
+    report = merge(results)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "mix"}
+    report["config"]["mix"] = dict(zip(operations, weights))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test for the rental services.")
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--rentals", type=int, default=None, help="ledger size (default: --vehicles)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=("threads", "processes"), default="threads")
+    parser.add_argument("--manager-mode", choices=sorted(MANAGER_MODES), default="eager")
+    parser.add_argument("--rate", type=float, default=0.0, help="target total requests/s (0 = open loop)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--ops", type=int, default=None, help="stop after this many requests in total")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for vehicle id skew")
+    parser.add_argument("--seed", type=int, default=1619)
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    print(f"{report['requests']} requests in {report['elapsed_s']:.2f}s "
+          f"({report['throughput_ops']:.1f} req/s), {report['conflicts']} conflicts, {report['errors']} errors")
+    print(f"{'operation':<10}{'requests':>10}{'ok':>8}{'conflict':>10}{'error':>8}"
+          f"{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}{'max ms':>10}")
+    for row in report["operations"]:
+        print(f"{row['operation']:<10}{row['requests']:>10}{row['ok']:>8}{row['conflict']:>10}{row['error']:>8}"
+              f"{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['p999_ms']:>10.2f}{row['max_ms']:>10.2f}")
+    for row in report["operations"]:
+        if row["lock_wait_p50_ms"] is not None:
+            print(f"{row['operation']:<10}lock wait p50 {row['lock_wait_p50_ms']:.2f}ms, "
+                  f"p99 {row['lock_wait_p99_ms']:.2f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
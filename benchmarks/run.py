@@ -0,0 +1,206 @@
+"""
+Benchmark suite for the load, query, rent and persist paths.
+
+Each size runs against real files in a temporary ``data/`` directory filled
+by the synthetic generator, and every operation reports latency percentiles
+and throughput. Results are written as JSON so runs can be compared::
+
+    python -m benchmarks.run --sizes 1000 10000 --output bench.json
+    python -m benchmarks.run --sizes 1000 10000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from benchmarks.datagen import write_dataset
+from src.vehicle_rental_system.services.rental_service import RentalService
+from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+MANAGER_MODES = {
+    "eager": {},
+    "lazy": {"lazy": True},
+    "binary": {"binary": True},
+}
+
+
+@contextmanager
+def temp_workdir():
+    """Run the body inside a fresh temp directory (FileHandler uses ./data)."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="vrs-bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(previous)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[rank]
+
+
+def summarize(operation, size, samples):
+    """Turn raw per-call durations (seconds) into a result row."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    ms = 1000.0
+    return {
+        "operation": operation,
+        "size": size,
+        "samples": len(ordered),
+        "mean_ms": total / len(ordered) * ms,
+        "p50_ms": percentile(ordered, 50) * ms,
+        "p90_ms": percentile(ordered, 90) * ms,
+        "p99_ms": percentile(ordered, 99) * ms,
+        "max_ms": ordered[-1] * ms,
+        "throughput_ops": len(ordered) / total if total else float("inf"),
+    }
+
+
+def time_calls(fn, repeat, setup=None):
+    """Time ``repeat`` calls of ``fn``; ``setup`` runs untimed before each."""
+    samples = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_size(size, args):
+    """Run every operation for one dataset size and return result rows."""
+    rng = random.Random(args.seed)
+    options = MANAGER_MODES[args.mode]
+    results = []
+
+    with temp_workdir():
+        write_dataset(size, seed=args.seed)
+
+        def load(_):
+            manager = VehicleManager(**options)
+            if manager.snapshot is not None:
+                manager.snapshot.close()
+
+        # the first binary load converts vehicles.json; keep it out of the samples
+        load(None)
+        results.append(summarize("load_vehicles", size, time_calls(load, args.repeat)))
+
+        vm = VehicleManager(**options)
+        rs = RentalService(vm)
+        results.append(summarize("load_rentals", size, time_calls(lambda _: rs.load_rentals(), args.repeat)))
+
+        ids = [rng.randint(1, size) for _ in range(args.lookups)]
+        results.append(summarize("get_vehicle_by_id", size,
+                                 time_calls(lambda i: vm.get_vehicle_by_id(ids[i]), len(ids))))
+
+        results.append(summarize("list_available", size,
+                                 time_calls(lambda _: vm.list_available(), args.repeat,
+                                            setup=vm.query_cache.invalidate)))
+        results.append(summarize("list_available_cached", size,
+                                 time_calls(lambda _: vm.list_available(), args.repeat)))
+
+        results.append(summarize("get_rent_history", size,
+                                 time_calls(lambda _: rs.get_rent_history(), args.repeat,
+                                            setup=rs.query_cache.invalidate)))
+
+        free = [v.vehicle_id for v in vm.list_available()]
+        rent_ids = rng.sample(free, min(args.rents, len(free)))
+        results.append(summarize("rent_vehicle", size,
+                                 time_calls(lambda i: rs.rent_vehicle("Bench", rent_ids[i], 3), len(rent_ids))))
+
+        results.append(summarize("save_vehicles", size, time_calls(lambda _: vm.save_vehicles(), args.repeat)))
+        results.append(summarize("save_rentals", size, time_calls(lambda _: rs.save_rentals(), args.repeat)))
+
+        if vm.snapshot is not None:
+            vm.snapshot.close()
+        if args.mode == "lazy":
+            vm.vehicles.close()
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print p50 ratios against a previous run and return the rows whose p50
+    grew by more than ``threshold`` (0.2 == 20% slower).
+    """
+    previous = {(r["operation"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'operation':<24}{'size':>10}{'base p50':>12}{'new p50':>12}{'ratio':>8}")
+    for row in results:
+        old = previous.get((row["operation"], row["size"]))
+        if old is None or not old["p50_ms"]:
+            continue
+        ratio = row["p50_ms"] / old["p50_ms"]
+        flag = "  <-- regression" if ratio > 1 + threshold else ""
+        print(f"{row['operation']:<24}{row['size']:>10}{old['p50_ms']:>12.3f}{row['p50_ms']:>12.3f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(row)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark VehicleManager and RentalService on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="vehicle/rental counts to run (default: 10^3 .. 10^6)")
+    parser.add_argument("--mode", choices=sorted(MANAGER_MODES), default="eager",
+                        help="VehicleManager storage mode")
+    parser.add_argument("--repeat", type=int, default=5, help="samples for whole-dataset operations")
+    parser.add_argument("--lookups", type=int, default=1000, help="samples for get_vehicle_by_id")
+    parser.add_argument("--rents", type=int, default=10, help="samples for rent_vehicle")
+    parser.add_argument("--seed", type=int, default=1619)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="p50 slowdown ratio treated as a regression with --compare")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        print(f"running size {size} ({args.mode})...", file=sys.stderr)
+        results.extend(bench_size(size, args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": args.mode,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    print(f"{'operation':<24}{'size':>10}{'p50 ms':>12}{'p90 ms':>12}{'p99 ms':>12}{'ops/s':>14}")
+    for row in results:
+        print(f"{row['operation']:<24}{row['size']:>10}{row['p50_ms']:>12.3f}"
+              f"{row['p90_ms']:>12.3f}{row['p99_ms']:>12.3f}{row['throughput_ops']:>14.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Startup benchmark for the CLI: time from launching ``python main.py`` until
+the main menu prompt is printed, on a synthetic dataset of a given size::
+
+    python -m benchmarks.startup --vehicles 100000 --repeat 10
+    python -m benchmarks.startup --vehicles 100000 --max-ms 300   # exits 1 above 300ms p50
+
+The menu must not wait for the data, so time-to-menu should stay flat as
+``--vehicles`` grows. Each run exits through option 9 once the prompt shows.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.datagen import write_dataset
+from benchmarks.run import percentile, temp_workdir
+
+ROOT = Path(__file__).resolve().parent.parent
+PROMPT = b"Enter your choice: "
+
+
+def time_to_menu(python=sys.executable):
+    """Launch main.py in the current directory and return seconds until the menu prompt."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    proc = subprocess.Popen([python, "-u", str(ROOT / "main.py")], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, env=env)
+    seen = b""
+    try:
+        while not seen.endswith(PROMPT):
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError("main.py exited before showing the menu")
+            seen += chunk
+        elapsed = time.perf_counter() - start
+        proc.communicate(b"9\n", timeout=60)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI time-to-menu.")
+    parser.add_argument("--vehicles", type=int, default=100000)
+    parser.add_argument("--rentals", type=int, default=None, help="ledger size (default: --vehicles)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the p50 exceeds this")
+    parser.add_argument("--output", help="write the samples as JSON to this path")
+    args = parser.parse_args(argv)
+
+    with temp_workdir():
+        write_dataset(args.vehicles, args.rentals)
+        samples = sorted(time_to_menu() for _ in range(args.repeat))
+
+    p50 = percentile(samples, 50) * 1000
+    print(f"time to menu with {args.vehicles} vehicles: p50 {p50:.1f}ms, "
+          f"min {samples[0] * 1000:.1f}ms, max {samples[-1] * 1000:.1f}ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"vehicles": args.vehicles, "samples_ms": [s * 1000 for s in samples],
+                       "p50_ms": p50}, f, indent=4)
+    if args.max_ms is not None and p50 > args.max_ms:
+        print(f"REGRESSION: p50 {p50:.1f}ms exceeds {args.max_ms:.1f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,69 @@
-from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
-from src.vehicle_rental_system.services.rental_service import RentalService
-from src.vehicle_rental_system.utils.helpers import pause
+import argparse
+import itertools
+import threading
+from contextlib import nullcontext
+from datetime import datetime
 
+from src.vehicle_rental_system.utils.helpers import pause, show_pages
 
-def main_menu(vehicle_manager, rental_service):
+# The services, metrics and profiling modules are imported where they are
+# first needed so the menu shows up before any data or heavy module loads.
+
+
+def profiled(profiler, label, **kwargs):
+    """Wrap an operation in the session profiler when profiling is on."""
+    return profiler.operation(label, **kwargs) if profiler else nullcontext()
+
+
+class DeferredServices:
+    """
+    Build the VehicleManager/RentalService pair off the startup path.
+
+    With ``background=True`` a daemon thread starts loading immediately so
+    the data is usually ready by the time the operator picks an option;
+    ``get()`` waits for it (or loads in the caller's thread) either way.
+    """
+    def __init__(self, profiler=None, background=True):
+        self.profiler = profiler
+        self._lock = threading.Lock()
+        self._services = None
+        if background:
+            threading.Thread(target=self._preload, name="load-data", daemon=True).start()
+
+    def _preload(self):
+        try:
+            self.get()
+        except Exception:
+            pass  # raised again from get() in the thread that needs the data
+
+    def get(self):
+        """Return ``(vehicle_manager, rental_service)``, loading them on first use."""
+        with self._lock:
+            if self._services is None:
+                from src.vehicle_rental_system.services.rental_service import RentalService
+                from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
+
+                with profiled(self.profiler, "load vehicles", trace_memory=True):
+                    vehicle_manager = VehicleManager()
+                with profiled(self.profiler, "load rentals", trace_memory=True):
+                    rental_service = RentalService(vehicle_manager)
+                self._services = (vehicle_manager, rental_service)
+            return self._services
+
+    @property
+    def vehicle_manager(self):
+        return self.get()[0]
+
+    @property
+    def rental_service(self):
+        return self.get()[1]
+
+
+def main_menu(services, profiler=None):
     """
     Simple CLI router that loops through menu options and dispatches to the
-    appropriate helper based on user keyboard input.
+    appropriate helper based on user keyboard input. ``services`` is a
+    DeferredServices; each option fetches the managers it needs from it.
     """
     while True:
         print("\n=== Vehicle Rental System ===")
@@ -15,51 +72,57 @@ def main_menu(vehicle_manager, rental_service):
         print("3. Rent a vehicle")
         print("4. Return a vehicle")
         print("5. Rent history")
+        print("6. Overdue and due returns")
         print("9. Exit")
 
         choice = input("Enter your choice: ").strip()
 
-        if choice == "1":
-            list_available_vehicles(vehicle_manager)
+        with profiled(profiler, f"menu {choice}"):
+            if choice == "1":
+                list_available_vehicles(services.vehicle_manager)
 
-        elif choice == "2":
-            list_rented_vehicles(vehicle_manager)
+            elif choice == "2":
+                list_rented_vehicles(services.vehicle_manager)
 
-        elif choice == "3":
-            rent_vehicle_cli(rental_service)
+            elif choice == "3":
+                rent_vehicle_cli(services.rental_service)
 
-        elif choice == "4":
-            return_vehicle_cli(rental_service)
+            elif choice == "4":
+                return_vehicle_cli(services.rental_service)
 
-        elif choice == "5":
-            rental_history_cli(rental_service)
-            
-        elif choice == "9":
-            print("Goodbye!")
-            break
+            elif choice == "5":
+                rental_history_cli(services.rental_service)
 
-        else:
-            print("Invalid option. Try again.")
-            pause()
+            elif choice == "6":
+                due_returns_cli(services.rental_service)
+
+            elif choice == "9":
+                print("Goodbye!")
+                break
+
+            else:
+                print("Invalid option. Try again.")
+                pause()
 
 
 def list_available_vehicles(vehicle_manager):
     """
-    Collect filter criteria from the user, fetch the resulting vehicles from the
-    manager, and render them in the console.
+    Collect filter criteria from the user, then page through the matching
+    vehicles as the manager yields them.
     """
     print("\n--- Filter Options ---")
     print("1. View all")
     print("2. Filter by brand")
     print("3. Filter by type")
+    print("4. Search brand/model")
     choice = input("Choose option: ").strip()
 
     if choice == "1":
-        vehicles = vehicle_manager.list_available()
+        vehicles = vehicle_manager.iter_vehicles(available=True)
 
     elif choice == "2":
         brand = input("Enter brand: ").strip()
-        vehicles = vehicle_manager.get_vehicles_by_brand(brand)
+        vehicles = vehicle_manager.iter_vehicles(brand=brand)
 
     elif choice == "3":
         print("\nTypes:")
@@ -76,39 +139,34 @@ def list_available_vehicles(vehicle_manager):
             pause()
             return
 
-        vehicles = vehicle_manager.get_vehicles_by_type(vehicle_type)
+        vehicles = vehicle_manager.iter_vehicles(vehicle_type=vehicle_type)
+
+    elif choice == "4":
+        text = input("Search (e.g. 'toy' or 'corola'): ").strip()
+        vehicles = vehicle_manager.search(text, available=True)
 
     else:
         print("Invalid option.")
         pause()
         return
 
-    # Display results
-    if not vehicles:
-        print("No vehicles found.")
-        pause()
-        return
+    show_pages("Available Vehicles:", vehicles, format_available, empty="No vehicles found.")
 
-    print("\nAvailable Vehicles:")
-    for v in vehicles:
-        print(f"{v.vehicle_id}: {v.vehicle_type()} - {v.brand} {v.model} | {v.price_per_day}/day")
 
-    pause()
+def format_available(v):
+    """One row of the available-vehicles view."""
+    return f"{v.vehicle_id}: {v.vehicle_type()} - {v.brand} {v.model} | {v.price_per_day}/day"
 
 
 def list_rented_vehicles(vehicle_manager):
-    """Display the list of vehicles that are currently marked as rented."""
-    vehicles = vehicle_manager.list_rented()
-    if not vehicles:
-        print("No rented vehicles.")
-        pause()
-        return
+    """Page through the vehicles that are currently marked as rented."""
+    show_pages("Rented Vehicles:", vehicle_manager.iter_vehicles(available=False), format_rented,
+               empty="No rented vehicles.")
 
-    print("\nRented Vehicles:")
-    for v in vehicles:
-        print(f"{v.vehicle_id}: {v.vehicle_type()} - {v.brand} {v.model}")
 
-    pause()
+def format_rented(v):
+    """One row of the rented-vehicles view."""
+    return f"{v.vehicle_id}: {v.vehicle_type()} - {v.brand} {v.model}"
 
 
 def rent_vehicle_cli(rental_service):
@@ -125,7 +183,7 @@ def rent_vehicle_cli(rental_service):
         pause()
         return
 
-    result = rental_service.rent_vehicle(renter_name, vehicle_id, int(days))
+    result = rental_service.rent_vehicle(renter_name, vehicle_id, int(days), alternatives=3)
     print(result)
     pause()
 
@@ -138,28 +196,84 @@ def return_vehicle_cli(rental_service):
     pause()
 
 def rental_history_cli(rental_service):
-    """Pretty-print the persisted rental history in reverse chronological order."""
-    history = rental_service.get_rent_history()
+    """Page through the rental history in reverse chronological order."""
+    show_pages("===== RENTAL HISTORY =====\n", rental_service.iter_rent_history(), format_rental,
+               page_size=10, empty="\nNo rental history found.\n")
+
+
+def format_rental(entry):
+    """One block of the rental history view."""
+    return (f"Renter:       {entry['renter']}\n"
+            f"Vehicle ID:   {entry['vehicle_id']}\n"
+            f"Days:         {entry['days']}\n"
+            f"Cost:         {entry['cost']} RWF\n"
+            f"Date:         {entry['date']}\n"
+            + "-" * 35)
+
+
+def due_returns_cli(rental_service):
+    """Page through overdue rentals, then the ones due back within a day."""
+    now = datetime.now()
+    rows = itertools.chain(
+        (("OVERDUE", due, entry) for due, entry in rental_service.overdue(now)),
+        (("due", due, entry) for due, entry in rental_service.upcoming_returns(now=now)),
+    )
+    show_pages("===== DUE RETURNS =====", rows, format_due,
+               empty="\nNo rentals are overdue or due within a day.\n")
+
+
+def format_due(row):
+    """One row of the due-returns view."""
+    status, due, entry = row
+    return f"{status:<8} {due:%Y-%m-%d %H:%M}  Vehicle {entry['vehicle_id']} - {entry['renter']}"
+
+
+def parse_args(argv=None):
+    """Parse the optional diagnostics switches of the CLI."""
+    parser = argparse.ArgumentParser(description="Vehicle Rental System")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="record hot-path metrics and write them on exit "
+                             "(JSON for *.json, Prometheus text otherwise)")
+    parser.add_argument("--profile", metavar="REPORT",
+                        help="profile the session and write a report (plus REPORT.prof) on exit")
+    parser.add_argument("--profile-ops", metavar="OPS",
+                        help="comma-separated menu options (and/or 'load') to run under cProfile "
+                             "instead of the whole session, e.g. '5' or 'load,1'")
+    return parser.parse_args(argv)
+
+
+def profiled_operations(spec):
+    """Translate the --profile-ops value into profiler operation labels."""
+    if not spec:
+        return None
+    labels = set()
+    for item in spec.split(","):
+        item = item.strip()
+        if item == "load":
+            labels.update({"load vehicles", "load rentals"})
+        elif item:
+            labels.add(f"menu {item}")
+    return labels
 
-    if not history:
-        print("\nNo rental history found.\n")
-        pause()
-        return
-
-    print("\n===== RENTAL HISTORY =====\n")
-
-    for entry in history:
-        print(f"Renter:       {entry['renter']}")
-        print(f"Vehicle ID:   {entry['vehicle_id']}")
-        print(f"Days:         {entry['days']}")
-        print(f"Cost:         {entry['cost']} RWF")
-        print(f"Date:         {entry['date']}")
-        print("-" * 35)
-
-    print()
-    pause()
 
 if __name__ == "__main__":
-    vm = VehicleManager()
-    rs = RentalService(vm)
-    main_menu(vm, rs)
+    args = parse_args()
+    registry = None
+    if args.metrics:
+        from src.vehicle_rental_system.utils import metrics
+        registry = metrics.enable()
+    profiler = None
+    if args.profile:
+        from src.vehicle_rental_system.utils.profiling import SessionProfiler
+        profiler = SessionProfiler(args.profile, profiled_operations(args.profile_ops))
+        profiler.start()
+    try:
+        # profiled sessions load in the foreground so the load is measured
+        # in the thread cProfile is watching
+        main_menu(DeferredServices(profiler, background=profiler is None), profiler)
+    finally:
+        if profiler:
+            profiler.stop()
+            print(f"Profile report written to {profiler.write_report()}")
+        if registry is not None:
+            registry.write(args.metrics)
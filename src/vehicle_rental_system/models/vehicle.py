@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 
 class Vehicle(ABC):
     """Base class for all rentable vehicles in the system."""
+    # set by VehicleManager so read views can keep pre-images of changes
+    _observer = None
+
     def __init__(self, vehicle_id, brand, model, base_price, available=True, type=None):
         self.vehicle_id = vehicle_id
         self.brand = brand
@@ -10,6 +13,18 @@ class Vehicle(ABC):
         self.available = available
         self.type = type
 
+    @property
+    def available(self):
+        """Whether the vehicle can currently be rented."""
+        return self._available
+
+    @available.setter
+    def available(self, value):
+        if self._observer is None:
+            self._available = value
+        else:
+            self._observer(self, value)
+
     # price per day, subclasses modify this
     @property
     def price_per_day(self):
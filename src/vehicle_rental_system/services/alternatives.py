@@ -0,0 +1,61 @@
+from bisect import bisect_left
+
+
+class AlternativeIndex:
+    """
+    Price-sorted (price_per_day, position) ladders per type, per brand and
+    per (type, brand), used to suggest replacements for a rented vehicle.
+
+    A suggestion query bisects to the requested price and walks outward in
+    both directions, so it touches only the nearest vehicles (plus any
+    rented ones it has to step over) instead of scanning the fleet.
+    """
+    def __init__(self, vehicles):
+        self.vehicles = vehicles
+        self.ladders = {}
+        for position, vehicle in enumerate(vehicles):
+            vtype, brand = vehicle.vehicle_type().lower(), vehicle.brand.lower()
+            entry = (vehicle.price_per_day, position)
+            for key in (("type", vtype), ("brand", brand), ("type+brand", vtype, brand)):
+                self.ladders.setdefault(key, []).append(entry)
+        for ladder in self.ladders.values():
+            ladder.sort()
+
+    def nearest(self, key, price):
+        """Yield positions on one ladder in order of increasing price distance."""
+        ladder = self.ladders.get(key, ())
+        right = bisect_left(ladder, (price, -1))
+        left = right - 1
+        while left >= 0 or right < len(ladder):
+            if right >= len(ladder) or (left >= 0 and price - ladder[left][0] <= ladder[right][0] - price):
+                yield ladder[left][1]
+                left -= 1
+            else:
+                yield ladder[right][1]
+                right += 1
+
+    def suggest(self, vehicle, k=3):
+        """
+        Return up to ``k`` available vehicles other than ``vehicle``: same type
+        and brand first, then same type, then same brand, each tier ordered by
+        how close ``price_per_day`` is.
+        """
+        vtype, brand = vehicle.vehicle_type().lower(), vehicle.brand.lower()
+        price = vehicle.price_per_day
+        tiers = (("type+brand", vtype, brand), ("type", vtype), ("brand", brand))
+
+        seen = set()
+        found = []
+        if k <= 0:
+            return found
+        for key in tiers:
+            for position in self.nearest(key, price):
+                if position in seen:
+                    continue
+                seen.add(position)
+                candidate = self.vehicles[position]
+                if candidate.available and candidate.vehicle_id != vehicle.vehicle_id:
+                    found.append(candidate)
+                    if len(found) == k:
+                        return found
+        return found
@@ -0,0 +1,115 @@
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+from ..utils.helpers import normalize_id
+
+
+def due_date(entry):
+    """When a rental entry is due back: its date plus its number of days."""
+    return datetime.fromisoformat(entry["date"]) + timedelta(days=entry["days"])
+
+
+class DueTracker:
+    """
+    Open rentals in min-heaps keyed by due time.
+
+    Rentals that were already due at the latest query time (``cutoff``) are
+    moved from ``_heap`` to a separate ``_expired`` heap, each one once, so
+    upcoming-return queries start at the earliest not-yet-due rental instead
+    of wading through every overdue one.
+
+    Returns use lazy deletion: the vehicle is dropped from ``open`` and its
+    heap slot is skipped when met (the heaps are rebuilt once stale slots
+    outnumber live ones). Queries walk the heaps in due order without
+    popping, so listing the k earliest-due rentals costs O(k log n) and the
+    heaps are left intact.
+    """
+    def __init__(self, entries=()):
+        self.open = {}      # normalize_id(vehicle_id) -> (due, seq, entry)
+        self._heap = []     # (due, seq, vehicle_id) due at or after cutoff, possibly stale
+        self._expired = []  # the same for rentals due before cutoff
+        self._cutoff = datetime.min
+        self._seq = itertools.count()
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self):
+        return len(self.open)
+
+    def add(self, entry):
+        """Track a new rental; it replaces any open rental of the same vehicle."""
+        vehicle_id = normalize_id(entry["vehicle_id"])
+        item = (due_date(entry), next(self._seq), entry)
+        self.open[vehicle_id] = item
+        heap = self._expired if item[0] < self._cutoff else self._heap
+        heapq.heappush(heap, (item[0], item[1], vehicle_id))
+
+    def remove(self, vehicle_id):
+        """Stop tracking the vehicle's open rental (it was returned)."""
+        if self.open.pop(normalize_id(vehicle_id), None) is not None:
+            if len(self._heap) + len(self._expired) > 2 * len(self.open) + 16:
+                self._rebuild()
+
+    def _rebuild(self):
+        self._heap, self._expired = [], []
+        for vehicle_id, (due, seq, _) in self.open.items():
+            (self._expired if due < self._cutoff else self._heap).append((due, seq, vehicle_id))
+        heapq.heapify(self._heap)
+        heapq.heapify(self._expired)
+
+    def _live(self, slot):
+        item = self.open.get(slot[2])
+        return item is not None and item[1] == slot[1]
+
+    def _advance(self, now):
+        """Move the rentals that fell due before ``now`` to the expired heap."""
+        if now <= self._cutoff:
+            return
+        heap = self._heap
+        while heap and heap[0][0] < now:
+            slot = heapq.heappop(heap)
+            if self._live(slot):
+                heapq.heappush(self._expired, slot)
+        self._cutoff = now
+
+    def _walk(self, heaps, start, cutoff, limit):
+        """
+        Yield ``(due, entry)`` for live rentals in ``heaps`` due in
+        ``[start, cutoff)``, earliest first, via a frontier of heap slots.
+        """
+        frontier = [(heap[0], h, 0) for h, heap in enumerate(heaps) if heap]
+        heapq.heapify(frontier)
+        found = 0
+        while frontier and (limit is None or found < limit):
+            slot, h, index = heapq.heappop(frontier)
+            due = slot[0]
+            if due >= cutoff:
+                break
+            if due >= start and self._live(slot):
+                found += 1
+                yield due, self.open[slot[2]][2]
+            heap = heaps[h]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], h, child))
+
+    def due_before(self, cutoff, limit=None):
+        """Yield ``(due, entry)`` for open rentals due before ``cutoff``, earliest first."""
+        return self._walk([self._expired, self._heap], datetime.min, cutoff, limit)
+
+    def overdue(self, now=None, limit=None):
+        """Open rentals whose due time has passed, most overdue first."""
+        now = now or datetime.now()
+        self._advance(now)
+        return list(self.due_before(now, limit))
+
+    def upcoming(self, within=timedelta(days=1), now=None, limit=None):
+        """Open rentals due in the next ``within``, soonest first (overdue ones excluded)."""
+        now = now or datetime.now()
+        self._advance(now)
+        if now == self._cutoff:
+            # everything in _heap is due at or after now: no overdue slot is visited
+            return list(self._walk([self._heap], now, now + within, limit))
+        # a query in the past of an earlier one: some of _expired is still upcoming then
+        return list(self._walk([self._expired, self._heap], now, now + within, limit))
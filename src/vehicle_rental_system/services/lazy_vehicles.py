@@ -0,0 +1,152 @@
+import json
+import mmap
+import os
+from collections import OrderedDict
+
+from ..utils.json_array import dump_element, write_elements
+from ..utils.offset_index import OffsetIndex
+
+
+class LazyVehicleList:
+    """
+    Read-only sequence of vehicles backed by a JSON file and an offset index.
+
+    Vehicle objects are only created when a lookup or a scan touches them and
+    live in a bounded LRU cache. A cold vehicle whose availability changed is
+    kept aside until the next ``save`` so evictions never lose state.
+
+    Records that ``accept`` rejects (unknown vehicle types) are not indexed,
+    so ``len``, indexing and iteration all use the same positions. Like an
+    eager save, ``save`` drops them from the file.
+    """
+    def __init__(self, path, factory, cache_size=1024, accept=None):
+        self.path = path
+        self.factory = factory
+        self.cache_size = cache_size
+        self.index = OffsetIndex(path, accept=accept)
+        self._file = None
+        self._map = None
+        self._cache = OrderedDict()  # file position -> (vehicle, available on disk)
+        self._dirty = {}             # evicted positions whose vehicle changed
+        self.open()
+
+    def open(self):
+        """Map the data file and its index (rebuilding a stale index)."""
+        self._release()
+        self.index.open()
+        self._file = open(self.path, "rb")
+        if self.path.stat().st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Release file handles and drop every cached vehicle."""
+        self._release()
+        self._cache.clear()
+        self._dirty.clear()
+
+    def _release(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self.index.close()
+        self._file = None
+        self._map = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        for position in range(len(self.index)):
+            vehicle = self._vehicle_at(position)
+            if vehicle is not None:
+                yield vehicle
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self.index)
+        if not 0 <= position < len(self.index):
+            raise IndexError("vehicle index out of range")
+        return self._vehicle_at(position)
+
+    def get(self, vehicle_id):
+        """Return the vehicle with ``vehicle_id`` or None, loading it if needed."""
+        position = self.index.find(int(vehicle_id))
+        if position is None:
+            return None
+        return self._vehicle_at(position)
+
+    def _vehicle_at(self, position):
+        """Serve a vehicle from the cache or materialize it from disk."""
+        if position in self._cache:
+            self._cache.move_to_end(position)
+            return self._cache[position][0]
+        if position in self._dirty:
+            return self._dirty[position]
+
+        vehicle = self.factory(self._record(position))
+        if vehicle is None:
+            return None  # unknown types are skipped, as in eager loading
+        self._cache[position] = (vehicle, vehicle.available)
+        if len(self._cache) > self.cache_size:
+            self._evict()
+        return vehicle
+
+    def _evict(self):
+        """Drop the coldest vehicle, parking it if it has unsaved changes."""
+        position, (vehicle, on_disk) = self._cache.popitem(last=False)
+        if vehicle.available != on_disk:
+            self._dirty[position] = vehicle
+
+    def _raw(self, position):
+        _, offset, length = self.index.span(position)
+        return self._map[offset:offset + length]
+
+    def _record(self, position):
+        return json.loads(self._raw(position))
+
+    def _changes(self):
+        """Map file positions to the availability they must be saved with."""
+        changes = {p: v.available for p, v in self._dirty.items()}
+        for position, (vehicle, on_disk) in self._cache.items():
+            if vehicle.available != on_disk:
+                changes[position] = vehicle.available
+        return changes
+
+    def save(self):
+        """
+        Rewrite the data file, copying untouched records byte-for-byte and
+        re-serializing only the ones whose availability changed. The index is
+        emitted in the same pass so the next open does not rescan the file.
+        """
+        changes = self._changes()
+        if not changes:
+            return
+
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        keys = []
+
+        def elements():
+            for position, (key, _, _) in enumerate(self.index.spans()):
+                keys.append(key)
+                if position in changes:
+                    record = self._record(position)
+                    record["available"] = changes[position]
+                    yield dump_element(record)
+                else:
+                    yield self._raw(position)
+
+        with open(tmp, "wb") as out:
+            spans = write_elements(out, elements())
+        entries = [(key, offset, length) for key, (offset, length) in zip(keys, spans)]
+
+        self._release()
+        os.replace(tmp, self.path)
+        self.index.write(entries)
+        self.open()
+
+        # record order is unchanged, so cached positions remain valid
+        self._cache = OrderedDict(
+            (position, (vehicle, vehicle.available)) for position, (vehicle, _) in self._cache.items()
+        )
+        self._dirty.clear()
@@ -0,0 +1,82 @@
+from datetime import date, datetime, timedelta
+
+
+def to_date(value):
+    """Accept a date, datetime or ISO string and return the calendar date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value).date()
+
+
+class OccupancyCalendar:
+    """
+    Number of vehicles of each type out on rent on every day of
+    ``[start, end]`` (inclusive), as planned by the ledger's date/days.
+
+    A rental starting on day d for n days marks d .. d+n-1. Each one only
+    adds +1/-1 to a per-type difference array; the daily counts are its
+    prefix sums, so a build costs O(rentals + days) rather than the sum of
+    all rental lengths. ``add`` folds in later rentals the same way.
+    """
+    def __init__(self, start, end, entries=(), type_of=None):
+        self.start = to_date(start)
+        self.end = to_date(end)
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        self.length = (self.end - self.start).days + 1
+        self.type_of = type_of or (lambda vehicle_id: "All")
+        self.unmatched = 0  # rentals of vehicles missing from the fleet
+        self._diff = {}     # type -> difference array of length + 1
+        self._counts = None
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry, vehicle_type=None):
+        """Fold one rental into the calendar."""
+        first = (to_date(entry["date"]) - self.start).days
+        last = first + int(entry["days"])  # exclusive
+        if last <= 0 or first >= self.length:
+            return
+        vehicle_type = vehicle_type or self.type_of(entry["vehicle_id"])
+        if vehicle_type is None:
+            self.unmatched += 1
+            return
+        diff = self._diff.get(vehicle_type)
+        if diff is None:
+            diff = self._diff[vehicle_type] = [0] * (self.length + 1)
+        diff[max(first, 0)] += 1
+        diff[min(last, self.length)] -= 1
+        self._counts = None
+
+    @property
+    def counts(self):
+        """``{type: [rented on day 0, day 1, ...]}``, recomputed only after changes."""
+        if self._counts is None:
+            counts = {}
+            for vehicle_type, diff in sorted(self._diff.items()):
+                running = 0
+                column = counts[vehicle_type] = [0] * self.length
+                for day in range(self.length):
+                    running += diff[day]
+                    column[day] = running
+            self._counts = counts
+        return self._counts
+
+    @property
+    def days(self):
+        return [self.start + timedelta(days=i) for i in range(self.length)]
+
+    def on(self, day):
+        """``{type: count}`` for one day of the range."""
+        index = (to_date(day) - self.start).days
+        if not 0 <= index < self.length:
+            raise KeyError(day)
+        return {vehicle_type: column[index] for vehicle_type, column in self.counts.items()}
+
+    def rows(self):
+        """Yield ``(date, {type: count})`` for every day, oldest first."""
+        counts = self.counts
+        for index, day in enumerate(self.days):
+            yield day, {vehicle_type: column[index] for vehicle_type, column in counts.items()}
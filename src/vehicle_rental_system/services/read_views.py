@@ -0,0 +1,143 @@
+import itertools
+import threading
+import weakref
+from collections import namedtuple
+from datetime import datetime
+
+from ..utils.json_array import iter_elements
+
+
+class VehicleRecord(namedtuple("VehicleRecord", "vehicle_id type brand model price_per_day available")):
+    """Read-only copy of a vehicle as seen by a read view."""
+    __slots__ = ()
+
+    def vehicle_type(self):
+        return self.type
+
+
+class ViewRegistry:
+    """
+    Copy-on-write bookkeeping for the read views of one fleet.
+
+    VehicleManager routes every ``vehicle.available`` assignment through
+    ``set_available``; before the flag changes, each live view that has not
+    seen that vehicle change yet keeps its old value. Views are held weakly,
+    so a report that drops its view stops costing the writers anything.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = weakref.WeakSet()
+
+    def __len__(self):
+        return len(self._views)
+
+    def register(self, view):
+        with self._lock:
+            self._views.add(view)
+        return view
+
+    def set_available(self, vehicle, value):
+        with self._lock:
+            old = vehicle._available
+            if old != value:
+                for view in self._views:
+                    view._preserve(vehicle, old)
+            vehicle._available = value
+
+
+class FleetView:
+    """
+    Point-in-time view of a fleet list, taken in O(1).
+
+    The view keeps a reference to the list and its length (the list itself is
+    only ever replaced wholesale, never edited in place) and a map of the
+    availability flags that changed since it was taken.
+    """
+    def __init__(self, vehicles):
+        self._vehicles = vehicles
+        self._count = len(vehicles)
+        self._before = {}  # id(vehicle) -> availability when the view was taken
+
+    def _preserve(self, vehicle, old):
+        self._before.setdefault(id(vehicle), old)
+
+    def _record(self, vehicle):
+        # read the live flag first: a writer records the old value before
+        # flipping it, so a flag read after the flip always finds it in _before
+        available = vehicle._available
+        return VehicleRecord(vehicle.vehicle_id, vehicle.vehicle_type(), vehicle.brand, vehicle.model,
+                             vehicle.price_per_day, self._before.get(id(vehicle), available))
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for vehicle in itertools.islice(self._vehicles, self._count):
+            yield self._record(vehicle)
+
+    def get_vehicle_by_id(self, vehicle_id):
+        """Return the vehicle record matching the identifier or None if missing."""
+        return next((v for v in self if int(v.vehicle_id) == int(vehicle_id)), None)
+
+    def list_available(self):
+        return [v for v in self if v.available]
+
+    def list_rented(self):
+        return [v for v in self if not v.available]
+
+
+class LedgerView:
+    """
+    Point-in-time view of a rental ledger, taken in O(1) (O(months) when
+    archived). The ledger is append-only, so a view only has to remember how
+    far it reached: a prefix of the in-memory list, a byte length of the
+    streamed file, and the entry count of every sealed month.
+    """
+    def __init__(self, entries=None, path=None, size=0, archive=None, sealed=None):
+        self._entries = entries
+        self._count = len(entries) if entries is not None else 0
+        self._path = path
+        self._size = size
+        self._archive = archive
+        self._sealed = sealed or {}
+
+    @classmethod
+    def of(cls, service):
+        """Take a view of a RentalService's ledger in whichever mode it runs."""
+        if service.streaming:
+            path = service.rental_file.ensure_exists()
+            return cls(path=path, size=path.stat().st_size)
+        if service.archive is not None:
+            sealed = {month: info["count"] for month, info in service.archive.partitions.items()
+                      if info["sealed"] and info["count"]}
+            return cls(service.rentals, archive=service.archive, sealed=sealed)
+        return cls(service.rentals)
+
+    def __iter__(self):
+        """Yield the entries in ledger (chronological) order."""
+        for month in sorted(self._sealed):
+            yield from self._archive.read_partition(month)[:self._sealed[month]]
+        if self._path is not None:
+            for offset, length, entry in iter_elements(self._path):
+                if offset + length > self._size:
+                    break
+                yield entry
+        if self._entries is not None:
+            yield from itertools.islice(self._entries, self._count)
+
+    def __len__(self):
+        if self._path is not None:
+            return sum(1 for _ in self)
+        return self._count + sum(self._sealed.values())
+
+    def get_rent_history(self, reverse=True):
+        """Return the entries sorted by date (most recent first by default)."""
+        return sorted(self, key=lambda r: datetime.fromisoformat(r["date"]), reverse=reverse)
+
+
+class ReadView:
+    """Consistent view of a fleet and its ledger; see RentalService.read_view."""
+    def __init__(self, vehicles, rentals):
+        self.vehicles = vehicles
+        self.rentals = rentals
+        self.taken_at = datetime.now()
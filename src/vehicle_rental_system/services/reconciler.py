@@ -0,0 +1,281 @@
+"""
+Consistency checker reconciling vehicles.json with rentals.json.
+
+Availability flags and the ledger are saved separately, so a crash between
+``save_vehicles`` and ``save_rentals`` (or a hand edit) leaves them out of
+step. The checker reports:
+
+* duplicate vehicle ids in the fleet,
+* vehicles marked rented that have no rental in the ledger, or whose
+  latest rental ended (date + days) more than ``grace_days`` ago, which is
+  what a crash between the two saves of a rent leaves behind,
+* orphan rentals whose vehicle_id is not in the fleet,
+
+and writes a JSON repair plan; nothing is changed on disk. Both files are
+split into chunks and scanned in parallel worker processes. When a fresh
+vehicles.snap sits next to the fleet file it holds the same records in
+fixed-width rows, so it is scanned instead of parsing the JSON. When the
+ledger has been moved into a rental archive (``data/rentals/manifest.json``)
+rentals.json is no longer written, so the archive's partitions are scanned
+instead, one per task::
+
+    python -m src.vehicle_rental_system.services.reconciler --output data/repair_plan.json
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from ..utils.fleet_snapshot import FleetSnapshot, is_fresh
+from ..utils.helpers import normalize_id
+from ..utils.json_array import iter_elements
+from ..utils.rental_archive import read_partition_file
+
+# every top-level element of a FileHandler-written (indent=4) array starts here
+ELEMENT_START = b"\n    {"
+# a rented vehicle whose latest rental ended longer ago than this is flagged
+GRACE_DAYS = 30
+
+
+def is_indented(path):
+    """True when the array uses FileHandler's indent=4 layout, so it can be split by bytes."""
+    with open(path, "rb") as f:
+        head = f.read(len(ELEMENT_START) + 1)
+    return head == b"[" + ELEMENT_START or head.rstrip() in (b"[]", b"[\n]")
+
+
+def chunk_spans(path, chunks):
+    """Split a file into at most ``chunks`` byte ranges (one if it cannot be split)."""
+    size = os.path.getsize(path)
+    if chunks <= 1 or size == 0 or not is_indented(path):
+        return [(0, size)]
+    step = -(-size // chunks)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def iter_chunk(path, start, end):
+    """
+    Yield the records of the elements whose start marker lies in
+    ``[start, end)``. Indented files are cut at element starts; anything
+    else is parsed whole by the streaming parser (one chunk covers it).
+    """
+    size = os.path.getsize(path)
+    if size == 0 or start >= end:
+        return
+    if not is_indented(path):
+        for _, _, record in iter_elements(path):
+            yield record
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        closing = mm.rfind(b"]")
+        # a marker starting just before ``end`` still belongs to this chunk
+        first = mm.find(ELEMENT_START, start, end + len(ELEMENT_START) - 1)
+        if first == -1 or first >= end or first >= closing:
+            return
+        stop = mm.find(ELEMENT_START, end)
+        body = mm[first + len(ELEMENT_START) - 1:stop if stop != -1 else closing].rstrip()
+    # the chunk's elements are decoded as one array, in a single C-level pass
+    yield from json.loads(b"[" + body.rstrip(b",") + b"]")
+
+
+def scan_vehicles(path, start, end):
+    """Worker task: ``(ids in file order, ids marked rented)`` for one chunk."""
+    ids, rented = [], []
+    for record in iter_chunk(path, start, end):
+        vehicle_id = normalize_id(record["vehicle_id"])
+        ids.append(vehicle_id)
+        if not record.get("available", True):
+            rented.append(vehicle_id)
+    return ids, rented
+
+
+def scan_snapshot(path, start, end):
+    """Worker task: like ``scan_vehicles`` for records ``[start, end)`` of a fleet snapshot."""
+    ids, rented = [], []
+    with FleetSnapshot(path) as snapshot:
+        for position in range(start, end):
+            vehicle_id = snapshot.record(position)["vehicle_id"]
+            ids.append(vehicle_id)
+            if not snapshot.is_available(position):
+                rented.append(vehicle_id)
+    return ids, rented
+
+
+def snapshot_spans(path, chunks):
+    """Split a snapshot's record positions into at most ``chunks`` ranges."""
+    with FleetSnapshot(path) as snapshot:
+        count = len(snapshot)
+    step = max(-(-count // max(chunks, 1)), 1)
+    return [(start, min(start + step, count)) for start in range(0, count, step)]
+
+
+def tally_rentals(entries):
+    """``{vehicle_id: [rental count, latest date, its days]}`` of entries in ledger order."""
+    latest = {}
+    for entry in entries:
+        vehicle_id = normalize_id(entry.get("vehicle_id"))
+        seen = latest.get(vehicle_id)
+        if seen is None:
+            latest[vehicle_id] = [1, entry.get("date"), entry.get("days")]
+        else:
+            seen[0] += 1
+            seen[1] = entry.get("date")
+            seen[2] = entry.get("days")
+    return latest
+
+
+def scan_rentals(path, start, end):
+    """Worker task: tally_rentals for one chunk of rentals.json."""
+    return tally_rentals(iter_chunk(path, start, end))
+
+
+def scan_partition(path, codec):
+    """Worker task: tally_rentals for one partition of a rental archive."""
+    return tally_rentals(read_partition_file(path, codec))
+
+
+def archive_partitions(manifest_path):
+    """``(path, codec)`` of every non-empty partition of an archive, oldest month first."""
+    with open(manifest_path, "r") as f:
+        partitions = json.load(f)["partitions"]
+    return [(manifest_path.parent / info["file"], info["codec"] if info["sealed"] else None)
+            for _, info in sorted(partitions.items()) if info["count"]]
+
+
+def rental_end(date, days):
+    """When a rental of ``days`` from ``date`` ended, or None if either is unreadable."""
+    try:
+        return datetime.fromisoformat(date) + timedelta(days=int(days))
+    except (TypeError, ValueError):
+        return None
+
+
+def reconcile(vehicles_path, rentals_path, workers=None, chunks=None, grace_days=GRACE_DAYS, now=None):
+    """Check both files and return the report / repair plan as a dict."""
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers * 4
+    now = now or datetime.now()
+    snapshot_path = Path(vehicles_path).with_suffix(".snap")
+    if snapshot_path.exists() and is_fresh(snapshot_path, vehicles_path):
+        vehicles_path, scan_fleet = snapshot_path, scan_snapshot
+        vehicle_spans = snapshot_spans(snapshot_path, chunks)
+    else:
+        scan_fleet = scan_vehicles
+        vehicle_spans = chunk_spans(vehicles_path, chunks)
+    manifest_path = Path(rentals_path).with_suffix("") / "manifest.json"
+    if manifest_path.exists():
+        # archive mode: rentals.json was imported once and new rentals only go to the partitions
+        rentals_path, scan_ledger = manifest_path.parent, scan_partition
+        rental_tasks = archive_partitions(manifest_path)
+    else:
+        scan_ledger = scan_rentals
+        rental_tasks = [(rentals_path, s, e) for s, e in chunk_spans(rentals_path, chunks)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            vehicle_parts = [pool.submit(scan_fleet, vehicles_path, s, e) for s, e in vehicle_spans]
+            rental_parts = [pool.submit(scan_ledger, *task) for task in rental_tasks]
+            vehicle_parts = [f.result() for f in vehicle_parts]
+            rental_parts = [f.result() for f in rental_parts]
+    else:
+        vehicle_parts = [scan_fleet(vehicles_path, s, e) for s, e in vehicle_spans]
+        rental_parts = [scan_ledger(*task) for task in rental_tasks]
+
+    # chunks and partitions come back in ledger order, so "first" and "latest" stay meaningful
+    fleet = set()
+    duplicates = {}
+    rented = set()
+    records = 0
+    for ids, rented_ids in vehicle_parts:
+        records += len(ids)
+        for vehicle_id in ids:
+            if vehicle_id in fleet:
+                duplicates[vehicle_id] = duplicates.get(vehicle_id, 1) + 1
+            else:
+                fleet.add(vehicle_id)
+        rented.update(rented_ids)
+
+    ledger = {}
+    entries = 0
+    for part in rental_parts:
+        for vehicle_id, (count, latest, days) in part.items():
+            entries += count
+            seen = ledger.get(vehicle_id)
+            if seen is None:
+                ledger[vehicle_id] = [count, latest, days]
+            else:
+                seen[0] += count
+                seen[1] = latest
+                seen[2] = days
+
+    actions = []
+    for vehicle_id in sorted(duplicates, key=str):
+        actions.append({"action": "remove_duplicates", "vehicle_id": vehicle_id,
+                        "occurrences": duplicates[vehicle_id], "keep": "first",
+                        "reason": "vehicle id appears more than once in the fleet"})
+    ended_before = now - timedelta(days=grace_days)
+    past_due = 0
+    for vehicle_id in sorted(rented, key=str):
+        if vehicle_id not in ledger:
+            actions.append({"action": "mark_available", "vehicle_id": vehicle_id,
+                            "reason": "marked rented but the ledger has no rental for it"})
+            continue
+        _, latest, days = ledger[vehicle_id]
+        ended = rental_end(latest, days)
+        if ended is not None and ended < ended_before:
+            past_due += 1
+            actions.append({"action": "mark_available", "vehicle_id": vehicle_id,
+                            "latest": latest, "days": days,
+                            "reason": f"marked rented but its latest rental ended on {ended.date()}, "
+                                      f"more than {grace_days} days ago"})
+    for vehicle_id in sorted(ledger.keys() - fleet, key=str):
+        count, latest, _ = ledger[vehicle_id]
+        actions.append({"action": "review_orphan_rentals", "vehicle_id": vehicle_id, "entries": count,
+                        "latest": latest,
+                        "reason": "ledger references a vehicle that is not in the fleet"})
+
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "vehicles_file": str(vehicles_path),
+        "rentals_file": str(rentals_path),
+        "summary": {
+            "vehicles": records,
+            "rentals": entries,
+            "duplicate_ids": len(duplicates),
+            "rented_without_rental": sum(a["action"] == "mark_available" for a in actions) - past_due,
+            "rented_past_due": past_due,
+            "orphan_vehicle_ids": sum(a["action"] == "review_orphan_rentals" for a in actions),
+        },
+        "actions": actions,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile fleet availability flags with the rental ledger.")
+    parser.add_argument("--vehicles", default="data/vehicles.json", help="fleet file (default: %(default)s)")
+    parser.add_argument("--rentals", default="data/rentals.json", help="ledger file (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunks", type=int, default=None, help="chunks per file (default: 4 per worker)")
+    parser.add_argument("--grace-days", type=int, default=GRACE_DAYS,
+                        help="flag rented vehicles whose latest rental ended longer ago (default: %(default)s)")
+    parser.add_argument("--output", default="data/repair_plan.json", help="repair plan path (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    report = reconcile(Path(args.vehicles), Path(args.rentals), args.workers, args.chunks, args.grace_days)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    summary = report["summary"]
+    print(f"Checked {summary['vehicles']} vehicles and {summary['rentals']} rentals: "
+          f"{summary['duplicate_ids']} duplicate ids, {summary['rented_without_rental']} rented without a rental, "
+          f"{summary['rented_past_due']} rented long after their latest rental ended, "
+          f"{summary['orphan_vehicle_ids']} orphan vehicle ids. Repair plan written to {args.output}")
+    return 1 if report["actions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
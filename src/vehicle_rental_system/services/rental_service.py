@@ -1,34 +1,169 @@
+import heapq
+import itertools
 import json
+import threading
+from collections import OrderedDict
 from ..utils.file_handler import FileHandler
-from datetime import datetime
+from ..utils.helpers import normalize_id
+from ..utils.idempotency import IdempotencyCache
+from ..utils.query_cache import QueryCache
+from .due_tracker import DueTracker
+from .occupancy import OccupancyCalendar, to_date
+from .read_views import LedgerView, ReadView
+from .vehicle_manager import fleet_lookup
+from datetime import datetime, timedelta
+from pathlib import Path
+
+_MICROSECOND = timedelta(microseconds=1)
+CALENDAR_CACHE_SIZE = 8  # occupancy ranges kept per service
 
 
 class RentalService:
-    """Coordinate rentals/returns and persist the transaction history."""
-    def __init__(self, vehicle_manager):
-        self.rental_file = FileHandler("rentals.json")
+    """
+    Coordinate rentals/returns and persist the transaction history.
+
+    With ``streaming=True`` the ledger is never loaded into memory: new
+    entries are appended to rentals.json in place and history is read back
+    through a streaming parser, so memory use does not depend on its size.
+
+    With ``archive`` set to "lzma" or "zlib" the ledger is partitioned by
+    month under data/rentals/: ``rentals`` only holds the current month and
+    older months are sealed, compressed and opened only when a history or
+    range query needs them. An existing rentals.json is imported once.
+
+    History queries are memoized in ``query_cache`` and invalidated by every
+    ledger write.
+
+    ``rent_vehicle`` and ``return_vehicle`` accept an ``idempotency_key``: a
+    retried request with the same key gets the first response back without
+    touching the fleet or ledger again. Keys live in a bounded, expiring
+    IdempotencyCache saved to rentals.idempotency.json.
+
+    ``overdue()`` and ``upcoming_returns()`` are answered from a DueTracker
+    heap of open rentals, built from the ledger on first use and then kept
+    current by rents and returns.
+
+    ``occupancy(start, end)`` builds a per-type, per-day OccupancyCalendar
+    from the ledger; the last few ranges stay cached and new rentals are
+    folded into them.
+
+    ``read_view()`` gives long-running reports a consistent point-in-time
+    view of fleet and ledger without blocking rents and returns.
+
+    ``filename`` and ``records`` work as for VehicleManager; the archive of a
+    ledger lives in a directory named after its file (rentals.json -> rentals/).
+    """
+    def __init__(self, vehicle_manager, streaming=False, archive=None, query_cache_size=32,
+                 filename="rentals.json", records=None, idempotency_size=1024, idempotency_ttl=24 * 3600):
+        if streaming and archive:
+            raise ValueError("streaming and archive modes are mutually exclusive")
+        self.rental_file = FileHandler(filename)
         self.vehicle_manager = vehicle_manager
+        self.streaming = streaming
+        self._records = records
+        self.archive = None
+        if archive:
+            from ..utils.rental_archive import RentalArchive  # pulls in the compression codecs
+            self.archive = RentalArchive(str(Path(filename).with_suffix("")), codec=archive)
+        self.query_cache = QueryCache(query_cache_size)
+        self._cached_rentals = None
+        self.idempotency = IdempotencyCache(idempotency_size, idempotency_ttl)
+        self._idempotency_name = str(Path(filename).with_suffix(".idempotency.json"))
+        self._idempotency_file = None  # opened on the first keyed request
+        self._due = None  # DueTracker, built on the first due-date query
+        self._calendars = OrderedDict()  # (start, end) -> OccupancyCalendar
+        self._date_order = None  # [ledger list checked, in date order?, latest date]
+        # held across each rent/return so a read view never sees half of one
+        self._write_lock = threading.Lock()
         self.rentals = self.load_rentals()
 
     def load_rentals(self):
         """Load previously saved rentals into memory."""
+        if self.streaming:
+            return None  # read on demand through iter_history()
+        if self.archive is not None:
+            if not self.archive.exists():
+                self.archive.import_entries(self.rental_file.stream())
+            return self.archive.load_hot()
+        if self._records is not None:
+            records, self._records = self._records, None
+            return records
         return self.rental_file.read()
 
     def save_rentals(self):
         """Persist the current rentals list to disk."""
+        self.query_cache.invalidate()
+        if self.streaming:
+            return  # entries are appended to disk as they are made
+        if self.archive is not None:
+            self.rentals = self.archive.save_hot(self.rentals)
+            return
         self.rental_file.write(self.rentals)
 
-    def rent_vehicle(self, renter_name, vehicle_id, days):
+    def _idempotency_cache(self):
+        """Return the idempotency cache, loading saved keys on first use."""
+        if self._idempotency_file is None:
+            self._idempotency_file = FileHandler(self._idempotency_name)
+            self.idempotency.load(self._idempotency_file.read())
+        return self.idempotency
+
+    def save_idempotency(self):
+        """Persist the idempotency keys if any changed since the last save."""
+        if self._idempotency_file is not None and self.idempotency.dirty:
+            self._idempotency_file.write(self.idempotency.records())
+            self.idempotency.dirty = False
+
+    def _idempotent(self, key, request, perform):
+        """Run ``perform()`` once per key; replay its response for retries."""
+        cache = self._idempotency_cache()
+        entry = cache.lookup(key)
+        if entry is not None:
+            stored_request, response = entry
+            if stored_request != request:
+                return f"Idempotency key {key!r} was already used for a different request."
+            return response
+        response = perform()
+        # saved right after the ledger/fleet write the response came from
+        cache.store(key, request, response)
+        self.save_idempotency()
+        return response
+
+    def read_view(self):
+        """
+        Return a ReadView whose ``vehicles`` and ``rentals`` stay exactly as
+        they were at this call while rentals continue.
+        """
+        with self._write_lock:
+            return ReadView(self.vehicle_manager.read_view(), LedgerView.of(self))
+
+    def rent_vehicle(self, renter_name, vehicle_id, days, alternatives=0, idempotency_key=None):
         """
         Reserve a vehicle for the requested number of days if it is available
-        and append the transaction to the rental ledger.
+        and append the transaction to the rental ledger. When the vehicle is
+        already rented, up to ``alternatives`` available replacements are
+        listed in the message.
         """
+        with self._write_lock:
+            if idempotency_key is None:
+                return self._rent(renter_name, vehicle_id, days, alternatives)
+            return self._idempotent(idempotency_key, ("rent", renter_name, str(vehicle_id), days),
+                                    lambda: self._rent(renter_name, vehicle_id, days, alternatives))
+
+    def _rent(self, renter_name, vehicle_id, days, alternatives=0):
         vehicle = self.vehicle_manager.get_vehicle_by_id(vehicle_id)
         if not vehicle:
             return f"No vehicle found with ID {vehicle_id}."
 
         if not vehicle.available:
-            return f"{vehicle.vehicle_type()} {vehicle_id} is already rented."
+            message = f"{vehicle.vehicle_type()} {vehicle_id} is already rented."
+            if alternatives:
+                suggestions = self.vehicle_manager.suggest_alternatives(vehicle, alternatives)
+                if suggestions:
+                    message += " Available alternatives: " + ", ".join(
+                        f"{v.vehicle_id} ({v.vehicle_type()} {v.brand} {v.model}, {v.price_per_day}/day)"
+                        for v in suggestions
+                    ) + "."
+            return message
 
         # calculate cost using polymorphism (price_per_day)
         vehicle.price_per_day
@@ -36,7 +171,7 @@ class RentalService:
 
         # update state
         vehicle.available = False
-        self.vehicle_manager.save_vehicles()
+        self.vehicle_manager.save_vehicles([vehicle])
 
         rental_entry = {
             "renter": renter_name,
@@ -46,13 +181,29 @@ class RentalService:
             "date": datetime.today().isoformat()
         }
 
-        self.rentals.append(rental_entry)
-        self.save_rentals()
+        if self.streaming:
+            self.rental_file.append(rental_entry)
+            self.query_cache.invalidate()
+        else:
+            self.rentals.append(rental_entry)
+            self.save_rentals()
+        self._note_date_order(rental_entry)
+        if self._due is not None:
+            self._due.add(rental_entry)
+        for calendar in self._calendars.values():
+            calendar.add(rental_entry, vehicle.vehicle_type())
 
         return f"{renter_name} successfully rented {vehicle.vehicle_type()} {vehicle_id} for {days} days. Total cost: {cost}."
 
-    def return_vehicle(self, vehicle_id):
+    def return_vehicle(self, vehicle_id, idempotency_key=None):
         """Flip the vehicle's availability back to True and persist the change."""
+        with self._write_lock:
+            if idempotency_key is None:
+                return self._return(vehicle_id)
+            return self._idempotent(idempotency_key, ("return", str(vehicle_id)),
+                                    lambda: self._return(vehicle_id))
+
+    def _return(self, vehicle_id):
         vehicle = self.vehicle_manager.get_vehicle_by_id(vehicle_id)
 
         if not vehicle:
@@ -62,15 +213,167 @@ class RentalService:
             return f"Vehicle {vehicle_id} is not currently rented."
 
         vehicle.available = True
-        self.vehicle_manager.save_vehicles()
+        self.vehicle_manager.save_vehicles([vehicle])
+        if self._due is not None:
+            self._due.remove(vehicle_id)
 
         return f"Vehicle {vehicle_id} has been returned successfully."
 
-    def get_rent_history(self, reverse=True):
+    def _due_tracker(self):
+        """
+        Return the DueTracker of open rentals, building it on first use from
+        the latest ledger entry of every vehicle that is still rented.
+        """
+        if self._due is None:
+            latest = {}
+            for entry in self.iter_history(reverse=False):
+                latest[normalize_id(entry["vehicle_id"])] = entry
+            is_rented = fleet_lookup(self.vehicle_manager, lambda v: not v.available)
+            self._due = DueTracker(
+                entry for vehicle_id, entry in latest.items()
+                if is_rented(vehicle_id)
+            )
+        return self._due
+
+    def overdue(self, now=None, limit=None):
+        """Open rentals past their due date as (due, entry) pairs, most overdue first."""
+        with self._write_lock:
+            return self._due_tracker().overdue(now, limit)
+
+    def upcoming_returns(self, within=timedelta(days=1), now=None, limit=None):
+        """Open rentals due within ``within`` from now as (due, entry) pairs, soonest first."""
+        with self._write_lock:
+            return self._due_tracker().upcoming(within, now, limit)
+
+    def occupancy(self, start, end):
+        """
+        Return the OccupancyCalendar of ``[start, end]`` (dates or ISO
+        strings). Calendars of the last ``CALENDAR_CACHE_SIZE`` ranges are
+        kept and updated in place by later rentals.
+        """
+        key = (to_date(start), to_date(end))
+        with self._write_lock:
+            calendar = self._calendars.get(key)
+            if calendar is not None:
+                self._calendars.move_to_end(key)
+                return calendar
+            # rentals that start after the range cannot overlap it
+            entries = self.iter_history(reverse=False, end=key[1])
+            type_of = fleet_lookup(self.vehicle_manager, lambda v: v.vehicle_type())
+            calendar = OccupancyCalendar(key[0], key[1], entries, type_of)
+            self._calendars[key] = calendar
+            while len(self._calendars) > CALENDAR_CACHE_SIZE:
+                self._calendars.popitem(last=False)
+            return calendar
+
+    def get_rent_history(self, reverse=True, start=None, end=None):
         """
         Return a date-sorted rental list (most recent first by default).
         reverse=True  → Most recent first
         reverse=False → Oldest first
+        start/end     → Optional inclusive date range (ISO string, date or datetime)
+        """
+        if self.rentals is not self._cached_rentals:
+            # the ledger list was reloaded or replaced wholesale
+            self._cached_rentals = self.rentals
+            self.query_cache.invalidate()
+
+        def compute():
+            rentals = self.iter_history(reverse=False, start=start, end=end)
+            return sorted(rentals, key=lambda r: datetime.fromisoformat(r["date"]),
+            reverse=reverse)
+
+        return list(self.query_cache.get_or_compute(("history", reverse, start, end), compute))
+
+    def _in_date_order(self):
+        """
+        Whether ledger order is date order, as it is when entries are appended
+        as they happen. Checked in one unbuffered pass the first time (and
+        after the ledger list is replaced); rents keep the answer current.
         """
-        return sorted(self.rentals, key=lambda r: datetime.fromisoformat(r["date"]),
-        reverse=reverse)
\ No newline at end of file
+        if self._date_order is None or self._date_order[0] is not self.rentals:
+            ordered, latest = True, None
+            for entry in self.iter_history(reverse=False):
+                when = datetime.fromisoformat(entry["date"])
+                if latest is not None and when < latest:
+                    ordered = False
+                    break
+                latest = when
+            self._date_order = [self.rentals, ordered, latest]
+        return self._date_order[1]
+
+    def _note_date_order(self, entry):
+        """Fold a just-appended entry into the cached date-order check."""
+        order = self._date_order
+        if order is None:
+            return
+        order[0] = self.rentals  # archive saves hand back a new hot list
+        if order[1]:
+            when = datetime.fromisoformat(entry["date"])
+            if order[2] is not None and when < order[2]:
+                order[1] = False
+            order[2] = when
+
+    def iter_rent_history(self, reverse=True, start=None, end=None):
+        """
+        Yield entries in the same order as get_rent_history, lazily. A ledger
+        in date order streams straight from iter_history, so only the rows
+        pulled are read; one found out of order falls back to a heap, built
+        in O(n) with each entry pulled costing O(log n).
+        """
+        if self._in_date_order():
+            entries = self.iter_history(reverse=reverse, start=start, end=end)
+            if not reverse:
+                yield from entries
+                return
+            # sorted(reverse=True) keeps equal dates in ledger order: undo the reversal per run
+            run = []
+            for entry in entries:
+                if run and entry["date"] != run[-1]["date"]:
+                    yield from reversed(run)
+                    run = []
+                run.append(entry)
+            yield from reversed(run)
+            return
+
+        keyed = []
+        for seq, entry in enumerate(self.iter_history(reverse=False, start=start, end=end)):
+            ticks = (datetime.fromisoformat(entry["date"]) - datetime.min) // _MICROSECOND
+            # seq keeps equal dates in ledger order, like the stable sort does
+            keyed.append((-ticks if reverse else ticks, seq, entry))
+        heapq.heapify(keyed)
+        while keyed:
+            yield heapq.heappop(keyed)[2]
+
+    def iter_history(self, reverse=True, start=None, end=None):
+        """
+        Yield rental entries one at a time in ledger order (newest first by
+        default). Entries are appended as they happen, so ledger order is
+        chronological; unlike get_rent_history nothing is sorted or buffered.
+        """
+        if self.archive is not None:
+            # sealed months are all older than the in-memory hot month
+            sealed = self.archive.iter_entries(start, end, reverse=reverse, sealed_only=True)
+            hot = self._filter_range(reversed(self.rentals) if reverse else self.rentals, start, end)
+            yield from (itertools.chain(hot, sealed) if reverse else itertools.chain(sealed, hot))
+            return
+
+        if self.streaming:
+            entries = self.rental_file.stream(reverse=reverse)
+        else:
+            entries = reversed(self.rentals) if reverse else self.rentals
+        yield from self._filter_range(entries, start, end)
+
+    @staticmethod
+    def _filter_range(entries, start, end):
+        """Yield entries whose date falls within the inclusive ``[start, end]`` range."""
+        if start is None and end is None:
+            yield from entries
+            return
+        from ..utils.rental_archive import to_datetime
+        start = to_datetime(start) if start is not None else None
+        end = to_datetime(end, end=True) if end is not None else None
+        for entry in entries:
+            when = to_datetime(entry["date"])
+            if (start is None or when >= start) and (end is None or when <= end):
+                yield entry
\ No newline at end of file
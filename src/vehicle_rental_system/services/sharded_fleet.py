@@ -0,0 +1,199 @@
+import heapq
+import os
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from ..utils.file_handler import FileHandler
+from .rental_service import RentalService
+from .vehicle_manager import VehicleManager
+
+SHARD_ROOT = "branches"
+
+
+def shard_files(name, directory=SHARD_ROOT):
+    """Return the (vehicles, rentals) filenames of a shard, relative to data/."""
+    return f"{directory}/{name}/vehicles.json", f"{directory}/{name}/rentals.json"
+
+
+def discover_shards(directory=SHARD_ROOT):
+    """List shard names that have a folder under ``data/<directory>/``."""
+    root = Path("data") / directory
+    if not root.is_dir():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir())
+
+
+def split_dataset(assign=None, directory=SHARD_ROOT):
+    """
+    Split the single data/vehicles.json + rentals.json into per-shard files.
+
+    ``assign(record)`` names the shard of a vehicle record (default: its
+    ``branch`` field, else "main"). Rentals follow their vehicle's shard;
+    rentals of unknown vehicles go to the "main" shard. The ``branch`` field
+    is dropped from the written records since the file location implies it.
+    """
+    assign = assign or (lambda record: record.get("branch", "main"))
+    vehicles = FileHandler("vehicles.json").read()
+    rentals = FileHandler("rentals.json").read()
+
+    routes = {}
+    fleets = {}
+    for record in vehicles:
+        shard = assign(record)
+        routes[int(record["vehicle_id"])] = shard
+        fleets.setdefault(shard, []).append({k: v for k, v in record.items() if k != "branch"})
+
+    ledgers = {shard: [] for shard in fleets}
+    for entry in rentals:
+        ledgers.setdefault(routes.get(int(entry["vehicle_id"]), "main"), []).append(entry)
+
+    for shard in ledgers:
+        vehicles_name, rentals_name = shard_files(shard, directory)
+        FileHandler(vehicles_name).write(fleets.get(shard, []))
+        FileHandler(rentals_name).write(ledgers[shard])
+    return sorted(ledgers)
+
+
+def _read_shard(files):
+    """Worker-process task: decode one shard's vehicle and rental files."""
+    vehicles_name, rentals_name = files
+    return FileHandler(vehicles_name).read(), FileHandler(rentals_name).read()
+
+
+class ShardedFleet:
+    """
+    Fleet split into per-branch shards, each with its own VehicleManager and
+    RentalService over ``data/branches/<shard>/{vehicles,rentals}.json``.
+
+    A routing table maps every vehicle_id to its shard so lookups, rents and
+    returns touch a single shard; listings and history fan out to all shards
+    and are merged. Shard files are decoded in parallel by a process pool at
+    startup (``workers=1`` loads in-process). ``manager_options`` such as
+    ``lazy=True`` are passed to every VehicleManager; lazy and binary shards
+    open their own indexes instead of being preloaded.
+    """
+    def __init__(self, shards=None, directory=SHARD_ROOT, workers=None, rental_options=None,
+                 **manager_options):
+        self.directory = directory
+        self.shard_names = list(shards) if shards is not None else discover_shards(directory)
+        if not self.shard_names:
+            raise ValueError(f"no shards found under data/{directory}/")
+        self.managers = {}
+        self.services = {}
+        self.routes = {}
+        self._load(workers, rental_options or {}, manager_options)
+
+    def _load(self, workers, rental_options, manager_options):
+        files = [shard_files(name, self.directory) for name in self.shard_names]
+        preload = not (manager_options.get("lazy") or manager_options.get("binary")
+                       or rental_options.get("streaming") or rental_options.get("archive"))
+        workers = workers or min(len(files), os.cpu_count() or 1)
+
+        if preload and workers > 1 and len(files) > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                decoded = list(pool.map(_read_shard, files))
+        else:
+            decoded = [(None, None)] * len(files)
+
+        for name, (vehicles_name, rentals_name), (vehicles, rentals) in zip(self.shard_names, files, decoded):
+            manager = VehicleManager(filename=vehicles_name, records=vehicles, **manager_options)
+            self.managers[name] = manager
+            self.services[name] = RentalService(manager, filename=rentals_name, records=rentals,
+                                                **rental_options)
+            if not manager.lazy:
+                for vehicle in manager.vehicles:
+                    vehicle_id = int(vehicle.vehicle_id)
+                    if vehicle_id in self.routes:
+                        raise ValueError(f"vehicle {vehicle_id} exists in shards "
+                                         f"{self.routes[vehicle_id]!r} and {name!r}")
+                    self.routes[vehicle_id] = name
+
+    def shard_of(self, vehicle_id):
+        """Return the shard name holding ``vehicle_id`` or None."""
+        vehicle_id = int(vehicle_id)
+        shard = self.routes.get(vehicle_id)
+        if shard is None:
+            # lazy shards are not enumerated up front; probe their indexes
+            for name, manager in self.managers.items():
+                if manager.lazy and manager.get_vehicle_by_id(vehicle_id) is not None:
+                    self.routes[vehicle_id] = shard = name
+                    break
+        return shard
+
+    def get_vehicle_by_id(self, vehicle_id):
+        """Look the vehicle up in its own shard only."""
+        shard = self.shard_of(vehicle_id)
+        return self.managers[shard].get_vehicle_by_id(vehicle_id) if shard else None
+
+    def _fan_out(self, method, *args):
+        """Run a listing query on every shard and concatenate in shard order."""
+        results = []
+        for manager in self.managers.values():
+            results.extend(getattr(manager, method)(*args))
+        return results
+
+    def get_vehicles_by_brand(self, vehicle_brand):
+        """Filter vehicles by brand across all shards."""
+        return self._fan_out("get_vehicles_by_brand", vehicle_brand)
+
+    def get_vehicles_by_type(self, vehicle_type):
+        """Filter vehicles by type across all shards."""
+        return self._fan_out("get_vehicles_by_type", vehicle_type)
+
+    def list_available(self):
+        """Return available vehicles from every shard."""
+        return self._fan_out("list_available")
+
+    def list_rented(self):
+        """Return rented vehicles from every shard."""
+        return self._fan_out("list_rented")
+
+    def save_vehicles(self, changed=None):
+        """Persist every shard's fleet."""
+        for manager in self.managers.values():
+            manager.save_vehicles(changed)
+
+    def rent_vehicle(self, renter_name, vehicle_id, days, alternatives=0, idempotency_key=None):
+        """Route a rental to the shard that owns the vehicle (alternatives come from that shard)."""
+        shard = self.shard_of(vehicle_id)
+        if shard is None:
+            return f"No vehicle found with ID {vehicle_id}."
+        return self.services[shard].rent_vehicle(renter_name, vehicle_id, days, alternatives, idempotency_key)
+
+    def return_vehicle(self, vehicle_id, idempotency_key=None):
+        """Route a return to the shard that owns the vehicle."""
+        shard = self.shard_of(vehicle_id)
+        if shard is None:
+            return f"Vehicle ID {vehicle_id} does not exist."
+        return self.services[shard].return_vehicle(vehicle_id, idempotency_key)
+
+    def get_rent_history(self, reverse=True, start=None, end=None):
+        """Merge every shard's date-sorted history into one sorted list."""
+        histories = [service.get_rent_history(reverse, start, end) for service in self.services.values()]
+        return list(heapq.merge(*histories, key=lambda r: datetime.fromisoformat(r["date"]), reverse=reverse))
+
+    def overdue(self, now=None, limit=None):
+        """Merge every shard's overdue rentals, most overdue first."""
+        now = now or datetime.now()
+        merged = heapq.merge(*(service.overdue(now, limit) for service in self.services.values()),
+                             key=itemgetter(0))
+        return list(merged)[:limit]
+
+    def upcoming_returns(self, within=timedelta(days=1), now=None, limit=None):
+        """Merge every shard's upcoming returns, soonest first."""
+        now = now or datetime.now()
+        merged = heapq.merge(*(service.upcoming_returns(within, now, limit)
+                               for service in self.services.values()), key=itemgetter(0))
+        return list(merged)[:limit]
+
+    def iter_rent_history(self, reverse=True, start=None, end=None):
+        """Lazily merge the shards' date-sorted histories."""
+        streams = [service.iter_rent_history(reverse, start, end) for service in self.services.values()]
+        yield from heapq.merge(*streams, key=lambda r: datetime.fromisoformat(r["date"]), reverse=reverse)
+
+    def iter_history(self, reverse=True, start=None, end=None):
+        """Lazily merge the shards' ledgers (each in chronological order)."""
+        streams = [service.iter_history(reverse, start, end) for service in self.services.values()]
+        yield from heapq.merge(*streams, key=lambda r: datetime.fromisoformat(r["date"]), reverse=reverse)
@@ -5,32 +5,183 @@ from ..models.car import Car
 from ..models.bike import Bike
 from ..models.truck import Truck
 from ..utils.file_handler import FileHandler
+from ..utils.helpers import normalize_id
+from ..utils.query_cache import QueryCache
+from ..utils.search_index import SearchIndex
+from .alternatives import AlternativeIndex
+from .read_views import FleetView, ViewRegistry
+
+VEHICLE_CLASSES = {"Car": Car, "Bike": Bike, "Truck": Truck}
+
+
+def is_known_type(record):
+    """True when ``record["type"]`` names a Vehicle subclass this build can load."""
+    return record.get("type") in VEHICLE_CLASSES
+
+
+def vehicle_from_record(record):
+    """Build the Vehicle subclass named by ``record["type"]`` (None if unknown)."""
+    vehicle_class = VEHICLE_CLASSES.get(record["type"])
+    if vehicle_class is None:
+        return None
+    return vehicle_class(**record)
+
+
+def fleet_lookup(vehicle_manager, value):
+    """
+    Return a ``vehicle_id -> value(vehicle)`` lookup over the manager's fleet
+    (None for unknown ids): a dict built in one pass for in-memory fleets,
+    index lookups for lazy ones. Ids match as in ``get_vehicle_by_id``.
+    """
+    if vehicle_manager.lazy:
+        def lookup(vehicle_id):
+            vehicle = vehicle_manager.get_vehicle_by_id(vehicle_id)
+            return value(vehicle) if vehicle is not None else None
+        return lookup
+    values = {}
+    for v in vehicle_manager.vehicles:
+        values.setdefault(normalize_id(v.vehicle_id), value(v))  # first match wins
+    return lambda vehicle_id: values.get(normalize_id(vehicle_id))
 
 
 class VehicleManager:
-    """Persist vehicles to disk and provide query helpers for the CLI/services."""
-    def __init__(self):
-        self.vehicles_file = FileHandler('vehicles.json')
+    """
+    Persist vehicles to disk and provide query helpers for the CLI/services.
+
+    With ``lazy=True`` the fleet is served from an offset index over
+    vehicles.json: vehicles are built on first access and at most
+    ``cache_size`` of them are kept in memory at once.
+
+    With ``binary=True`` the fleet is decoded from the mmap-backed snapshot
+    vehicles.snap, which is (re)converted from vehicles.json whenever that
+    file changed since the last conversion. Lookups by id binary-search the
+    snapshot. Saving flips the changed availability flags in place and, if
+    any flipped, writes vehicles.json back from the snapshot, so the JSON
+    stays the one source of truth for every other mode.
+
+    Listing queries are memoized in ``query_cache`` (``query_cache_size``
+    entries); every save invalidates them, so callers that change a vehicle
+    must call ``save_vehicles`` as RentalService does.
+
+    ``search()`` matches brand/model by prefix with typo tolerance through a
+    SearchIndex built on first use and rebuilt whenever the fleet reloads.
+
+    ``read_view()`` returns a point-in-time view of the fleet for long reports;
+    it stays fixed while rentals keep flipping availability flags.
+
+    ``filename`` is relative to the data folder (shards use their own files);
+    ``records`` may carry the file's already-decoded content, e.g. parsed in a
+    worker process, so the eager load skips reading it again.
+    """
+    def __init__(self, lazy=False, cache_size=1024, binary=False, query_cache_size=128,
+                 filename='vehicles.json', records=None):
+        self.vehicles_file = FileHandler(filename)
+        self._records = records
+        self.lazy = lazy
+        self.cache_size = cache_size
+        self.binary = binary
+        self.snapshot = None
+        self.query_cache = QueryCache(query_cache_size)
+        self._cached_vehicles = None
+        self.views = ViewRegistry()
+        self._tracked_vehicles = None
+        self._search_index = None
+        self._alternatives = None
         self.vehicles = self.load_vehicles()
 
+    def cached(self, key, compute):
+        """
+        Serve ``compute()`` through the query cache. Lazy fleets bypass it so
+        cached results never pin vehicles beyond the memory budget.
+        """
+        if self.lazy:
+            return compute()
+        if self.vehicles is not self._cached_vehicles:
+            # the vehicle list was reloaded or replaced wholesale
+            self._cached_vehicles = self.vehicles
+            self.query_cache.invalidate()
+        return self.query_cache.get_or_compute(key, compute)
+
+    def read_view(self):
+        """
+        Take a copy-on-write view of the fleet. The first view after a load
+        hooks every vehicle (O(n)); later views are O(1) and writers only
+        copy the flags they change while views are alive.
+        """
+        if self.lazy:
+            raise ValueError("read views need an in-memory fleet (lazy=False)")
+        vehicles = self.vehicles
+        if vehicles is not self._tracked_vehicles:
+            for vehicle in vehicles:
+                vehicle._observer = self.views.set_available
+            self._tracked_vehicles = vehicles
+        return self.views.register(FleetView(vehicles))
+
     def load_vehicles(self):
         """Instantiate Vehicle subclasses from the serialized JSON records."""
-        data = self.vehicles_file.read()
+        if self.lazy:
+            from .lazy_vehicles import LazyVehicleList  # only lazy fleets need the offset index
+            return LazyVehicleList(self.vehicles_file.ensure_exists(), vehicle_from_record, self.cache_size,
+                                   accept=is_known_type)
+        if self.binary:
+            return self._load_snapshot()
+
+        if self._records is not None:
+            data, self._records = self._records, None
+        else:
+            data = self.vehicles_file.read()
         vehicles = []
         for v in data:
-            vtype = v["type"]
-            if vtype == "Car":
-                vehicles.append(Car(**v))
-            elif vtype == "Bike":
-                vehicles.append(Bike(**v))
-            elif vtype == "Truck":
-                vehicles.append(Truck(**v))
-            else:
+            vehicle = vehicle_from_record(v)
+            if vehicle is None:
                 continue  # ignore unknown types
+            vehicles.append(vehicle)
         return vehicles
 
-    def save_vehicles(self):
-        """Write the in-memory vehicle state back to the JSON file."""
+    def _load_snapshot(self):
+        """Build vehicles from the binary snapshot, converting vehicles.json if it is missing or stale."""
+        from ..utils.fleet_snapshot import FleetSnapshot, is_fresh, json_to_snapshot
+        if self.snapshot is not None:
+            self.snapshot.close()
+        source = self.vehicles_file.ensure_exists()
+        path = source.with_suffix(".snap")
+        if not is_fresh(path, source):
+            json_to_snapshot(source, path)
+
+        self.snapshot = FleetSnapshot(path, writable=True)
+        # unknown types were left out of the snapshot, so list positions match record positions
+        return [vehicle_from_record(record) for record in self.snapshot]
+
+    def save_vehicles(self, changed=None):
+        """
+        Write the in-memory vehicle state back to the JSON file. ``changed``
+        may list the vehicles that were modified, so a binary snapshot only
+        flips their flags instead of comparing the whole fleet.
+        """
+        self.query_cache.invalidate()
+        if self.lazy:
+            self.vehicles.save()
+            return
+        if self.binary:
+            if changed is None:
+                positions = range(len(self.vehicles))
+            else:
+                # vehicles of other fleets (e.g. other shards) are not ours to save
+                positions = []
+                for v in changed:
+                    position = self.snapshot.find(v.vehicle_id)
+                    if position is not None and self.vehicles[position] is v:
+                        positions.append(position)
+            flipped = False
+            for position in positions:
+                available = self.vehicles[position].available
+                if available != self.snapshot.is_available(position):
+                    self.snapshot.set_available(position, available)
+                    flipped = True
+            if flipped:
+                self.snapshot.write_json(self.vehicles_file.path)
+            return
+
         data = []
         for v in self.vehicles:
             data.append({
@@ -46,20 +197,74 @@ class VehicleManager:
 
     def get_vehicle_by_id(self, vehicle_id):
         """Return the vehicle matching the identifier or None if missing."""
+        if self.lazy:
+            return self.vehicles.get(vehicle_id)
+        if self.binary:
+            position = self.snapshot.find(vehicle_id)
+            return self.vehicles[position] if position is not None else None
         return next((v for v in self.vehicles if int(v.vehicle_id) == int(vehicle_id)), None)
 
     def get_vehicles_by_brand(self, vehicle_brand):
         """Filter vehicles by exact brand name (case-insensitive)."""
-        return [v for v in self.vehicles if v.brand.lower() == vehicle_brand.lower()]
+        brand = vehicle_brand.lower()
+        return list(self.cached(
+            ("brand", brand), lambda: [v for v in self.vehicles if v.brand.lower() == brand]
+        ))
     
     def get_vehicles_by_type(self, vehicle_type):
         """Filter vehicles by their declared type string (case-insensitive)."""
-        return [v for v in self.vehicles if v.type.lower() == vehicle_type.lower()]
+        vtype = vehicle_type.lower()
+        return list(self.cached(
+            ("type", vtype), lambda: [v for v in self.vehicles if v.type.lower() == vtype]
+        ))
     
+    def search_index(self):
+        """Return the brand/model SearchIndex of the current fleet."""
+        if self._search_index is None or self._search_index.vehicles is not self.vehicles:
+            self._search_index = SearchIndex(self.vehicles)
+        return self._search_index
+
+    def search(self, query, available=None, fuzzy=True, limit=None):
+        """
+        Find vehicles whose brand or model starts with the query words, or
+        nearly does ("toy", "corola"); ``available`` filters on availability.
+        """
+        key = ("search", " ".join(query.casefold().split()), available, fuzzy, limit)
+        return list(self.cached(key, lambda: self.search_index().search(query, available, fuzzy, limit)))
+
+    def complete(self, prefix, limit=10):
+        """Suggest indexed brand/model terms starting with ``prefix``."""
+        return self.search_index().complete(prefix, limit)
+
+    def suggest_alternatives(self, vehicle, k=3):
+        """
+        Up to ``k`` available replacements for ``vehicle``: same type first,
+        then same brand, closest ``price_per_day`` first within each.
+        """
+        if self._alternatives is None or self._alternatives.vehicles is not self.vehicles:
+            self._alternatives = AlternativeIndex(self.vehicles)
+        return self._alternatives.suggest(vehicle, k)
+
+    def iter_vehicles(self, available=None, brand=None, vehicle_type=None):
+        """
+        Yield vehicles matching the optional filters one at a time, so a
+        paged view only pulls the vehicles it shows.
+        """
+        brand = brand.lower() if brand is not None else None
+        vtype = vehicle_type.lower() if vehicle_type is not None else None
+        for v in self.vehicles:
+            if available is not None and v.available != available:
+                continue
+            if brand is not None and v.brand.lower() != brand:
+                continue
+            if vtype is not None and v.type.lower() != vtype:
+                continue
+            yield v
+
     def list_available(self):
         """Return only vehicles that are currently free to rent."""
-        return [v for v in self.vehicles if v.available]
+        return list(self.cached(("available",), lambda: [v for v in self.vehicles if v.available]))
 
     def list_rented(self):
         """Return only vehicles that are currently checked out."""
-        return [v for v in self.vehicles if not v.available]
+        return list(self.cached(("rented",), lambda: [v for v in self.vehicles if not v.available]))
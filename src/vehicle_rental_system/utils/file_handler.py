@@ -1,21 +1,62 @@
 import json
 from pathlib import Path
 
+from .json_array import append_element, iter_items
+
 class FileHandler:
-    """Thin wrapper around reading/writing JSON blobs inside the data folder."""
+    """
+    Thin wrapper around reading/writing JSON blobs inside the data folder.
+
+    Constructing a handler does not touch the disk; the data folder and an
+    empty ``[]`` file are created on first use (or by ``ensure_exists``).
+    """
+    _exists = False  # set once the file is known to exist
+
     def __init__(self, filename):
         self.path = Path("data") / filename
-        self.path.parent.mkdir(exist_ok=True)
 
-        if not self.path.exists():
-            self.write([])
+    def ensure_exists(self):
+        """Create the data folder and an empty JSON array file if missing."""
+        if not self._exists:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.path.exists():
+                with open(self.path, "w") as f:
+                    f.write(self.encode([]))
+            self._exists = True
+        return self.path
 
     def read(self):
         """Return the JSON contents as Python data structures."""
+        self.ensure_exists()
         with open(self.path, "r") as f:
-            return json.load(f)
+            return self.decode(f.read())
 
     def write(self, data):
         """Serialize the provided data back to JSON with indentation."""
+        text = self.encode(data)
+        if not self._exists:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._exists = True
         with open(self.path, "w") as f:
-            json.dump(data, f, indent=4)
+            f.write(text)
+
+    @staticmethod
+    def encode(data):
+        """Serialize data to indented JSON text (kept apart from I/O for metrics)."""
+        return json.dumps(data, indent=4)
+
+    @staticmethod
+    def decode(text):
+        """Parse JSON text back into Python data structures."""
+        return json.loads(text)
+
+    def stream(self, reverse=False):
+        """
+        Yield the items of the stored JSON array one by one instead of
+        loading the whole file (last item first when ``reverse`` is True).
+        """
+        return iter_items(self.ensure_exists(), reverse=reverse)
+
+    def append(self, item):
+        """Append a single item to the stored JSON array without rewriting it."""
+        append_element(self.ensure_exists(), item)
@@ -0,0 +1,251 @@
+"""
+Versioned binary snapshot format for the vehicle fleet.
+
+Layout (little endian)::
+
+    header   magic "VRFS", version, record count, slot/string table offsets,
+             size/mtime of the vehicles.json it was converted from
+    records  fixed 32-byte rows in the original vehicles.json order
+    slots    u32 record positions sorted by vehicle_id (binary search)
+    strings  UTF-8 string table shared by brand/model (deduplicated)
+
+The file is read through ``mmap`` so opening is zero-copy, and each record's
+availability is a single byte that can be flipped in place. vehicles.json
+stays the source of truth: ``is_fresh`` tells whether it changed since the
+conversion, and ``FleetSnapshot.write_json`` writes flipped flags back to it.
+Records of unknown types are left out, as eager loading skips them.
+"""
+import argparse
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from .json_array import dump_element, iter_elements, write_elements
+
+MAGIC = b"VRFS"
+VERSION = 2
+
+# magic, version, record count, slots offset, strings offset, strings length,
+# source size, source mtime_ns
+_HEADER = struct.Struct("<4sHxxIQQQQq")
+# vehicle_id, base_price, brand (offset, length), model (offset, length), type, available
+_RECORD = struct.Struct("<qdIHIHBBxx")
+_SLOT = struct.Struct("<I")
+_SOURCE = struct.Struct("<Qq")  # the header's trailing source size, mtime_ns
+_SOURCE_OFFSET = _HEADER.size - _SOURCE.size
+_AVAILABLE_OFFSET = _RECORD.size - 3  # byte position of the flag inside a record
+
+TYPE_CODES = ("Car", "Bike", "Truck")
+
+
+def write_snapshot(records, path, source_stat=None):
+    """
+    Encode vehicle records (dicts shaped like vehicles.json) into ``path``.
+    ``source_stat`` is the ``os.stat`` of the JSON they came from, if any.
+    """
+    strings = {}
+    table = bytearray()
+
+    def intern(text):
+        if text not in strings:
+            encoded = text.encode("utf-8")
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f"string too long for snapshot: {text[:32]!r}...")
+            strings[text] = (len(table), len(encoded))
+            table.extend(encoded)
+        return strings[text]
+
+    rows = bytearray()
+    keys = []
+    for record in records:
+        vtype = record["type"]
+        if vtype not in TYPE_CODES:
+            continue  # skipped like VehicleManager.load_vehicles does
+        keys.append(int(record["vehicle_id"]))
+        rows += _RECORD.pack(
+            keys[-1],
+            float(record["base_price"]),
+            *intern(record["brand"]),
+            *intern(record["model"]),
+            TYPE_CODES.index(vtype),
+            1 if record.get("available", True) else 0,
+        )
+
+    count = len(keys)
+    slots_offset = _HEADER.size + len(rows)
+    strings_offset = slots_offset + count * _SLOT.size
+    order = sorted(range(count), key=keys.__getitem__)
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, count, slots_offset, strings_offset, len(table),
+                             source_stat.st_size if source_stat else 0,
+                             source_stat.st_mtime_ns if source_stat else 0))
+        f.write(rows)
+        f.write(b"".join(_SLOT.pack(i) for i in order))
+        f.write(table)
+    os.replace(tmp, path)
+
+
+class FleetSnapshot:
+    """
+    Zero-copy reader over a fleet snapshot file.
+
+    Open with ``writable=True`` to flip availability flags in place; call
+    ``flush`` to push them to disk.
+    """
+    def __init__(self, path, writable=False):
+        self.path = Path(path)
+        self.writable = writable
+        self._file = open(self.path, "r+b" if writable else "rb")
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+        magic, version, count, slots, strings, _, _, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a fleet snapshot")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path}: unsupported snapshot version {version}")
+        self._count = count
+        self._slots = slots
+        self._strings = strings
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap the file and close the handle."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+
+    def flush(self):
+        """Write in-place modifications back to the file."""
+        self._map.flush()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self.record(position)
+
+    def _string(self, offset, length):
+        start = self._strings + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def record(self, position):
+        """Decode the record at ``position`` into a vehicles.json-style dict."""
+        vid, price, b_off, b_len, m_off, m_len, vtype, available = _RECORD.unpack_from(
+            self._map, _HEADER.size + position * _RECORD.size
+        )
+        return {
+            "vehicle_id": vid,
+            "type": TYPE_CODES[vtype],
+            "brand": self._string(b_off, b_len),
+            "model": self._string(m_off, m_len),
+            "base_price": price,
+            "available": bool(available),
+        }
+
+    def _key(self, i):
+        """vehicle_id of the i-th record in sorted order."""
+        position = _SLOT.unpack_from(self._map, self._slots + i * _SLOT.size)[0]
+        return struct.unpack_from("<q", self._map, _HEADER.size + position * _RECORD.size)[0], position
+
+    def find(self, vehicle_id):
+        """Return the record position of ``vehicle_id`` or None (O(log n))."""
+        vehicle_id = int(vehicle_id)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[0] < vehicle_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            key, position = self._key(lo)
+            if key == vehicle_id:
+                return position
+        return None
+
+    def is_available(self, position):
+        """Read a single availability flag without decoding the record."""
+        return self._map[_HEADER.size + position * _RECORD.size + _AVAILABLE_OFFSET] == 1
+
+    def set_available(self, position, available):
+        """Flip the availability flag of the record at ``position`` in place."""
+        self._map[_HEADER.size + position * _RECORD.size + _AVAILABLE_OFFSET] = 1 if available else 0
+
+    def write_json(self, json_path):
+        """
+        Export the records to ``json_path`` in the indented vehicles.json
+        layout. A writable snapshot then records that file as its source, so
+        it stays fresh against the JSON it just wrote.
+        """
+        json_path = Path(json_path)
+        tmp = json_path.with_suffix(json_path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            write_elements(f, (dump_element(record) for record in self))
+        os.replace(tmp, json_path)
+        if self.writable:
+            stat = os.stat(json_path)
+            _SOURCE.pack_into(self._map, _SOURCE_OFFSET, stat.st_size, stat.st_mtime_ns)
+            self.flush()
+
+
+def json_to_snapshot(json_path, snapshot_path):
+    """Convert a vehicles.json file into a snapshot, streaming the input."""
+    # stat before reading, so a write racing the conversion leaves it stale
+    stat = os.stat(json_path)
+    write_snapshot((record for _, _, record in iter_elements(json_path)), snapshot_path, stat)
+
+
+def is_fresh(snapshot_path, json_path):
+    """Check the snapshot's stored source size/mtime against ``json_path`` on disk."""
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        magic, version, _, _, _, _, size, mtime_ns = _HEADER.unpack(header)
+    except (OSError, struct.error):
+        return False
+
+    stat = os.stat(json_path)
+    return (magic == MAGIC and version == VERSION
+            and size == stat.st_size and mtime_ns == stat.st_mtime_ns)
+
+
+def snapshot_to_json(snapshot_path, json_path):
+    """Export a snapshot back to the indented vehicles.json layout."""
+    with FleetSnapshot(snapshot_path) as snapshot:
+        snapshot.write_json(json_path)
+
+
+def main(argv=None):
+    """Command-line entry point for converting between JSON and snapshots."""
+    parser = argparse.ArgumentParser(description="Convert fleet data between JSON and binary snapshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    to_snap = sub.add_parser("to-snapshot", help="vehicles.json -> snapshot")
+    to_snap.add_argument("source")
+    to_snap.add_argument("target")
+    to_json = sub.add_parser("to-json", help="snapshot -> vehicles.json")
+    to_json.add_argument("source")
+    to_json.add_argument("target")
+    args = parser.parse_args(argv)
+
+    if args.command == "to-snapshot":
+        json_to_snapshot(args.source, args.target)
+    else:
+        snapshot_to_json(args.source, args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,53 @@
+from itertools import islice
+
+PAGE_SIZE = 20
+
+
+def normalize_id(vehicle_id):
+    """
+    Key a vehicle id the way ``get_vehicle_by_id`` matches it: ledger ids may
+    be ints or CLI strings ("7", "07"), so compare them as ints where possible.
+    """
+    try:
+        return int(vehicle_id)
+    except (TypeError, ValueError):
+        return str(vehicle_id).strip()
+
+
 def pause():
     """Block execution until the user acknowledges the previous output."""
-    input("Press Enter to continue...")
\ No newline at end of file
+    input("Press Enter to continue...")
+
+
+def show_pages(title, rows, render, page_size=PAGE_SIZE, empty="No results."):
+    """
+    Print ``rows`` (any iterable, ideally a generator) one page at a time.
+
+    Only the rows of the page being shown are pulled from the iterable (plus
+    one to know whether another page follows) and each page is rendered into
+    a single string written with one ``print``. Returns the number of rows
+    shown before the user stopped.
+    """
+    iterator = iter(rows)
+    page = list(islice(iterator, page_size + 1))
+    if not page:
+        print(empty)
+        pause()
+        return 0
+
+    shown = 0
+    number = 1
+    while True:
+        more = len(page) > page_size
+        rows_text = "\n".join(render(row) for row in page[:page_size])
+        shown += min(len(page), page_size)
+        heading = title if number == 1 else f"{title} (page {number})"
+        print(f"\n{heading}\n{rows_text}")
+
+        if not more:
+            pause()
+            return shown
+        if input("Enter for the next page, q to go back: ").strip().lower() == "q":
+            return shown
+        page = page[page_size:] + list(islice(iterator, page_size))
+        number += 1
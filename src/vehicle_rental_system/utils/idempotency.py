@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+
+
+class IdempotencyCache:
+    """
+    Bounded cache of responses keyed by client-supplied idempotency keys.
+
+    Each key remembers the request it was first used for and the response
+    that request got. Entries expire ``ttl`` seconds after they were stored
+    and the oldest are dropped beyond ``maxsize``, so memory stays bounded.
+    ``records``/``load`` convert to and from a JSON-friendly list so the
+    cache can be saved next to the ledger; expiry uses wall-clock time for
+    that reason.
+    """
+    def __init__(self, maxsize=1024, ttl=24 * 3600, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.dirty = False
+        self._entries = OrderedDict()  # key -> (expires, request, response)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expire(self, now):
+        # entries are kept in insertion order and share one ttl, so the
+        # expired ones are always at the front
+        while self._entries:
+            key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[key]
+            self.dirty = True
+
+    def lookup(self, key):
+        """Return ``(request, response)`` stored for ``key`` or None."""
+        self._expire(self.clock())
+        entry = self._entries.get(key)
+        return None if entry is None else entry[1:]
+
+    def store(self, key, request, response):
+        """Remember the response given to ``request`` under ``key``."""
+        now = self.clock()
+        self._expire(now)
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl, request, response)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self.dirty = True
+
+    def records(self):
+        """Return the live entries as JSON-serializable dicts, oldest first."""
+        self._expire(self.clock())
+        return [
+            {"key": key, "expires": expires, "request": list(request), "response": response}
+            for key, (expires, request, response) in self._entries.items()
+        ]
+
+    def load(self, records):
+        """Replace the cache content with previously saved ``records``."""
+        self._entries.clear()
+        for record in sorted(records, key=lambda r: r["expires"]):
+            self._entries[record["key"]] = (record["expires"], tuple(record["request"]), record["response"])
+        self._expire(self.clock())
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self.dirty = False
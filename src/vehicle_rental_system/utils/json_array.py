@@ -0,0 +1,159 @@
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_elements(path, chunk_size=1 << 16):
+    """
+    Yield ``(offset, length, value)`` for every element of the top-level JSON
+    array stored at ``path`` without loading the whole file into memory.
+
+    The file is decoded as latin-1 so that character positions line up with
+    byte positions; multi-byte UTF-8 sequences never collide with JSON's ASCII
+    structural characters, so the spans stay exact for any UTF-8 input.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "rb") as f:
+        buf = ""
+        base = 0  # byte offset of buf[0] in the file
+        pos = 0
+        eof = False
+        state = "start"
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+
+            need_more = pos >= len(buf)
+            if not need_more and (state == "value" or (state == "first" and buf[pos] != "]")):
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # a number or literal touching the buffer end may keep growing
+                    need_more = end >= len(buf) and not eof
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"{path}: malformed JSON at byte {base + pos}")
+                    need_more = True
+
+            if need_more:
+                if eof:
+                    if state == "start":
+                        return  # an empty file behaves like an empty array
+                    raise ValueError(f"{path}: unexpected end of JSON array")
+                # drop consumed text before pulling in the next chunk
+                buf = buf[pos:]
+                base += pos
+                pos = 0
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf += chunk.decode("latin-1")
+                continue
+
+            ch = buf[pos]
+            if state == "start":
+                if ch != "[":
+                    raise ValueError(f"{path}: expected a top-level JSON array")
+                pos += 1
+                state = "first"
+            elif ch == "]" and state in ("first", "next"):
+                return
+            elif state == "next":
+                if ch != ",":
+                    raise ValueError(f"{path}: expected ',' at byte {base + pos}")
+                pos += 1
+                state = "value"
+            else:
+                text = buf[pos:end]
+                if not text.isascii():
+                    value = json.loads(text.encode("latin-1").decode("utf-8"))
+                yield base + pos, end - pos, value
+                pos = end
+                state = "next"
+
+
+def dump_element(value):
+    """
+    Serialize ``value`` the way ``json.dump(items, f, indent=4)`` lays out a
+    list element, so callers can stream arrays without building the list.
+    """
+    return json.dumps(value, indent=4).replace("\n", "\n    ").encode()
+
+
+def write_elements(f, elements):
+    """
+    Write already-encoded elements to the binary file ``f`` as a JSON array
+    matching ``json.dump(..., indent=4)``; returns ``(offset, length)`` spans.
+    """
+    spans = []
+    f.write(b"[")
+    for raw in elements:
+        f.write(b",\n    " if spans else b"\n    ")
+        spans.append((f.tell(), len(raw)))
+        f.write(raw)
+    f.write(b"\n]" if spans else b"]")
+    return spans
+
+
+def iter_items(path, reverse=False, block_size=1024):
+    """
+    Stream the elements of a top-level JSON array one at a time.
+
+    With ``reverse=True`` the file is scanned once to remember where every
+    ``block_size``-th element starts, then blocks are decoded back to front,
+    so memory stays bounded by the block size rather than the file size.
+    """
+    if not reverse:
+        for _, _, value in iter_elements(path):
+            yield value
+        return
+
+    blocks = []  # (start, end) byte ranges holding up to block_size elements
+    count = 0
+    for offset, length, _ in iter_elements(path):
+        if count % block_size == 0:
+            blocks.append([offset, offset + length])
+        else:
+            blocks[-1][1] = offset + length
+        count += 1
+
+    with open(path, "rb") as f:
+        for start, end in reversed(blocks):
+            f.seek(start)
+            block = json.loads(b"[" + f.read(end - start) + b"]")
+            yield from reversed(block)
+
+
+def append_element(path, value):
+    """
+    Append ``value`` to the top-level JSON array in ``path`` in place by
+    rewriting only the closing bracket, instead of re-serializing the file.
+    """
+    with open(path, "r+b") as f:
+        close = _last_structural(f, f.seek(0, 2))
+        if close is None or _peek(f, close) != b"]":
+            raise ValueError(f"{path}: expected a top-level JSON array")
+        before = _last_structural(f, close)
+        if before is None:
+            raise ValueError(f"{path}: expected a top-level JSON array")
+        empty = _peek(f, before) == b"["
+
+        f.seek(before + 1)
+        f.write((b"\n    " if empty else b",\n    ") + dump_element(value) + b"\n]")
+        f.truncate()
+
+
+def _peek(f, position):
+    f.seek(position)
+    return f.read(1)
+
+
+def _last_structural(f, before, chunk_size=256):
+    """Return the position of the last non-whitespace byte before ``before``."""
+    while before > 0:
+        start = max(0, before - chunk_size)
+        f.seek(start)
+        chunk = f.read(before - start).rstrip(b" \t\n\r")
+        if chunk:
+            return start + len(chunk) - 1
+        before = start
+    return None
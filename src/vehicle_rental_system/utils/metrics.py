@@ -0,0 +1,273 @@
+"""
+Lightweight counters and latency histograms for the hot paths.
+
+Instrumentation is opt-in: ``enable()`` swaps timing wrappers onto
+FileHandler, VehicleManager and RentalService methods and ``disable()``
+restores the originals, so a disabled process runs the untouched code.
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "vrs_calls_total": "Service method calls by outcome.",
+    "vrs_call_seconds": "Service method latency in seconds.",
+    "vrs_file_seconds": "FileHandler I/O latency in seconds.",
+    "vrs_json_seconds": "JSON encode/decode latency in seconds.",
+    "vrs_file_bytes_read_total": "Bytes read from data files.",
+    "vrs_file_bytes_written_total": "Bytes written to data files.",
+}
+
+
+class Metrics:
+    """Thread-safe registry of labelled counters and histograms."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+    def inc(self, name, value=1, **labels):
+        """Add ``value`` to a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Record one observation (seconds) in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            data = self._histograms.get(key)
+            if data is None:
+                data = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += value
+            data[-1] += 1
+
+    def reset(self):
+        """Forget every recorded value."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Return a JSON-serializable copy of all metrics."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = []
+            for (name, labels), data in sorted(self._histograms.items()):
+                histograms.append({
+                    "name": name,
+                    "labels": dict(labels),
+                    "buckets": dict(zip([str(b) for b in self.buckets], _cumulative(data[:-2]))),
+                    "sum": data[-2],
+                    "count": data[-1],
+                })
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=4)
+
+    def to_prometheus(self):
+        """Render the registry in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for c in snap["counters"]:
+            header(c["name"], "counter")
+            lines.append(f"{c['name']}{_labels(c['labels'])} {c['value']}")
+        for h in snap["histograms"]:
+            header(h["name"], "histogram")
+            for bound, count in h["buckets"].items():
+                lines.append(f"{h['name']}_bucket{_labels(h['labels'], le=bound)} {count}")
+            lines.append(f"{h['name']}_bucket{_labels(h['labels'], le='+Inf')} {h['count']}")
+            lines.append(f"{h['name']}_sum{_labels(h['labels'])} {h['sum']}")
+            lines.append(f"{h['name']}_count{_labels(h['labels'])} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump a snapshot to ``path``: JSON for ``*.json``, Prometheus text otherwise."""
+        text = self.to_json() if str(path).endswith(".json") else self.to_prometheus()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+def _cumulative(counts):
+    total = 0
+    out = []
+    for count in counts:
+        total += count
+        out.append(total)
+    return out
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, **extra):
+    merged = {**labels, **extra}
+    if not merged:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in merged.items()) + "}"
+
+
+metrics = Metrics()
+
+# method names wrapped by enable(), per class
+SERVICE_METHODS = {
+    "VehicleManager": ["load_vehicles", "save_vehicles", "get_vehicle_by_id", "get_vehicles_by_brand",
+                       "get_vehicles_by_type", "list_available", "list_rented", "iter_vehicles",
+                       "search", "complete", "suggest_alternatives", "read_view"],
+    "RentalService": ["load_rentals", "save_rentals", "rent_vehicle", "return_vehicle", "get_rent_history",
+                      "iter_rent_history", "iter_history", "overdue", "upcoming_returns", "occupancy",
+                      "read_view"],
+}
+
+_originals = {}  # (class, name) -> original class attribute
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable(registry=None):
+    """Install timing wrappers on the hot paths and return the registry used."""
+    from ..services.rental_service import RentalService
+    from ..services.vehicle_manager import VehicleManager
+    from .file_handler import FileHandler
+
+    registry = registry or metrics
+    disable()
+
+    for cls in (VehicleManager, RentalService):
+        for name in SERVICE_METHODS[cls.__name__]:
+            _wrap(cls, name, _timed_call(registry, cls.__name__, name))
+
+    _wrap(FileHandler, "read", _timed_io(registry, "read"))
+    _wrap(FileHandler, "write", _timed_io(registry, "write"))
+    _wrap(FileHandler, "append", _timed_io(registry, "append"))
+    _wrap(FileHandler, "encode", _timed_json(registry, "encode"))
+    _wrap(FileHandler, "decode", _timed_json(registry, "decode"))
+    return registry
+
+
+def disable():
+    """Restore every wrapped method to its original implementation."""
+    for (cls, name), original in _originals.items():
+        setattr(cls, name, original)
+    _originals.clear()
+
+
+def _wrap(cls, name, decorator):
+    original = cls.__dict__[name]
+    _originals[(cls, name)] = original
+    if isinstance(original, staticmethod):
+        setattr(cls, name, staticmethod(decorator(original.__func__)))
+    else:
+        setattr(cls, name, decorator(original))
+
+
+def _timed_call(registry, component, method):
+    def record(seconds, outcome):
+        registry.observe("vrs_call_seconds", seconds, component=component, method=method)
+        registry.inc("vrs_calls_total", component=component, method=method, outcome=outcome)
+
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            return _timed_generator(fn, record)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                record(time.perf_counter() - start, outcome)
+        return wrapper
+    return decorator
+
+
+def _timed_generator(fn, record):
+    """
+    Time a generator over its whole iteration. Only the time spent producing
+    items counts, not the caller's time between them (e.g. a pager waiting
+    for Enter); a caller that stops early still records an "ok" call.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        items = fn(*args, **kwargs)
+        spent = 0.0
+        outcome = "error"
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                finally:
+                    spent += time.perf_counter() - start
+                yield item
+            outcome = "ok"
+        except GeneratorExit:
+            outcome = "ok"
+            items.close()
+            raise
+        finally:
+            record(spent, outcome)
+    return wrapper
+
+
+def _timed_io(registry, operation):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            before = self.path.stat().st_size if operation == "append" and self.path.exists() else 0
+            start = time.perf_counter()
+            result = fn(self, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+
+            name = self.path.name
+            registry.observe("vrs_file_seconds", elapsed, operation=operation, file=name)
+            size = self.path.stat().st_size
+            if operation == "read":
+                registry.inc("vrs_file_bytes_read_total", size, file=name)
+            else:
+                registry.inc("vrs_file_bytes_written_total", size - before, file=name)
+            return result
+        return wrapper
+    return decorator
+
+
+def _timed_json(registry, operation):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.observe("vrs_json_seconds", time.perf_counter() - start, operation=operation)
+        return wrapper
+    return decorator
@@ -0,0 +1,133 @@
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from pathlib import Path
+
+from .json_array import iter_elements
+
+# magic, version, source size, source mtime_ns, record count
+_HEADER = struct.Struct("<4sHxxQqQ")
+# key, byte offset, byte length (stored in file order)
+_ENTRY = struct.Struct("<qQI")
+# position of an entry, stored in key order for binary search
+_SLOT = struct.Struct("<I")
+
+MAGIC = b"VIDX"
+VERSION = 2
+
+
+class OffsetIndex:
+    """
+    Compact on-disk index mapping an integer key to the byte span of a record
+    inside a JSON array file.
+
+    Entries are kept in file order (so scans preserve the original ordering)
+    followed by a key-sorted permutation used for O(log n) lookups. The index
+    is read through ``mmap`` so opening it costs the same for ten vehicles as
+    for ten million. Records rejected by ``accept`` are left out, so every
+    index position maps to a usable record.
+    """
+    def __init__(self, source, index_path=None, key="vehicle_id", accept=None):
+        self.source = Path(source)
+        self.path = Path(index_path) if index_path else self.source.with_suffix(".idx")
+        self.key = key
+        self.accept = accept
+        self._file = None
+        self._map = None
+        self._count = 0
+
+    def open(self):
+        """Map the index, rebuilding it first if the source file changed."""
+        self.close()
+        if not self._is_fresh():
+            self.build()
+
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = _HEADER.unpack_from(self._map, 0)[4]
+        return self
+
+    def close(self):
+        """Release the mapping and the underlying file handle."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+        self._count = 0
+
+    def build(self):
+        """Scan the source once and write a fresh index next to it."""
+        entries = []
+        for offset, length, record in iter_elements(self.source):
+            if self.accept is not None and not self.accept(record):
+                continue
+            entries.append((int(record[self.key]), offset, length))
+
+        self.write(entries)
+
+    def write(self, entries):
+        """Persist ``(key, offset, length)`` entries given in file order."""
+        # stable sort keeps the first record for duplicate keys, matching the
+        # first-match semantics of a linear scan
+        order = sorted(range(len(entries)), key=lambda i: entries[i][0])
+
+        stat = self.source.stat()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, stat.st_size, stat.st_mtime_ns, len(entries)))
+            for entry in entries:
+                f.write(_ENTRY.pack(*entry))
+            for i in order:
+                f.write(_SLOT.pack(i))
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return self._count
+
+    def span(self, position):
+        """Return ``(key, offset, length)`` for the entry at a file position."""
+        return _ENTRY.unpack_from(self._map, _HEADER.size + position * _ENTRY.size)
+
+    def spans(self):
+        """Iterate every entry in source-file order."""
+        for position in range(self._count):
+            yield self.span(position)
+
+    def find(self, key):
+        """Return the file position of ``key`` or None when it is not indexed."""
+        sorted_keys = _SortedKeys(self)
+        i = bisect_left(sorted_keys, key)
+        if i < self._count and sorted_keys[i] == key:
+            return sorted_keys.position(i)
+        return None
+
+    def _is_fresh(self):
+        """Check the stored source size/mtime against the file on disk."""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER.size)
+            magic, version, size, mtime_ns, _ = _HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+
+        stat = self.source.stat()
+        return (magic == MAGIC and version == VERSION
+                and size == stat.st_size and mtime_ns == stat.st_mtime_ns)
+
+
+class _SortedKeys:
+    """Sequence view of the index keys in sorted order, for ``bisect``."""
+    def __init__(self, index):
+        self._index = index
+        self._slots = _HEADER.size + index._count * _ENTRY.size
+
+    def __len__(self):
+        return self._index._count
+
+    def position(self, i):
+        return _SLOT.unpack_from(self._index._map, self._slots + i * _SLOT.size)[0]
+
+    def __getitem__(self, i):
+        return self._index.span(self.position(i))[0]
@@ -0,0 +1,164 @@
+import builtins
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+
+class SessionProfiler:
+    """
+    Record what a CLI session or scripted workload spent its time on.
+
+    cProfile covers the whole session, or only the operations whose labels
+    are listed in ``operations``. Every ``operation()`` block also records
+    wall and CPU time; time spent blocked in ``input()`` is tracked and
+    subtracted so prompts do not inflate wall time. Blocks opened with
+    ``trace_memory=True`` record their tracemalloc peak. ``write_report``
+    writes a text report plus the raw ``.prof`` data next to it.
+
+    Usable as a context manager around a scripted workload::
+
+        with SessionProfiler("profile.txt") as profiler:
+            with profiler.operation("load", trace_memory=True):
+                vm = VehicleManager()
+    """
+    def __init__(self, report_path, operations=None, top=30):
+        self.report_path = Path(report_path)
+        self.operations = set(operations) if operations else None
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.records = []  # (label, wall, cpu, waiting, peak bytes or None)
+        self.started = None
+        self._session_start = None
+        self._session_wall = 0.0
+        self._waiting = 0.0
+        self._original_input = None
+        self._profiling = False
+        self._selected_depth = 0  # selected operations currently open
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        self.write_report()
+
+    def start(self):
+        """Begin the session: hook ``input()`` and start whole-session profiling."""
+        self.started = datetime.now()
+        self._session_start = time.perf_counter()
+        self._original_input = builtins.input
+        builtins.input = self._timed_input
+        if self.operations is None:
+            self._enable()
+
+    def stop(self):
+        """End the session and restore ``input()``."""
+        self._disable()
+        self._session_wall = time.perf_counter() - self._session_start
+        if self._original_input is not None:
+            builtins.input = self._original_input
+            self._original_input = None
+
+    def _timed_input(self, *args):
+        start = time.perf_counter()
+        try:
+            return self._original_input(*args)
+        finally:
+            self._waiting += time.perf_counter() - start
+
+    def _enable(self):
+        if not self._profiling:
+            self.profile.enable()
+            self._profiling = True
+
+    def _disable(self):
+        if self._profiling:
+            self.profile.disable()
+            self._profiling = False
+
+    @contextmanager
+    def operation(self, label, trace_memory=False):
+        """
+        Time one operation; profile it too when it was selected. Operations
+        may nest (the first menu option loads the data): profiling stays on
+        until the outermost selected one ends.
+        """
+        selected = self.operations is not None and label in self.operations
+        if selected:
+            self._selected_depth += 1
+            self._enable()
+        if trace_memory:
+            was_tracing = tracemalloc.is_tracing()
+            if was_tracing:
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+
+        waiting = self._waiting
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            waited = self._waiting - waiting
+            peak = None
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                if not was_tracing:
+                    tracemalloc.stop()
+            if selected:
+                self._selected_depth -= 1
+                if not self._selected_depth:
+                    self._disable()
+            self.records.append((label, wall - waited, cpu, waited, peak))
+
+    def summary(self):
+        """Aggregate records per label: calls, wall/cpu totals and maxima, peak memory."""
+        rows = {}
+        for label, wall, cpu, waited, peak in self.records:
+            row = rows.setdefault(label, {"calls": 0, "wall": 0.0, "max_wall": 0.0,
+                                          "cpu": 0.0, "waiting": 0.0, "peak": None})
+            row["calls"] += 1
+            row["wall"] += wall
+            row["max_wall"] = max(row["max_wall"], wall)
+            row["cpu"] += cpu
+            row["waiting"] += waited
+            if peak is not None:
+                row["peak"] = max(row["peak"] or 0, peak)
+        return rows
+
+    def write_report(self):
+        """Write the text report and the raw cProfile dump (``.prof``)."""
+        out = io.StringIO()
+        out.write("Vehicle Rental System profile report\n")
+        out.write(f"Started:  {self.started.isoformat(timespec='seconds')}\n")
+        out.write(f"Session:  {self._session_wall:.3f}s wall, "
+                  f"{self._waiting:.3f}s waiting for input\n")
+        scope = "whole session" if self.operations is None else ", ".join(sorted(self.operations))
+        out.write(f"Profiled: {scope}\n\n")
+
+        out.write(f"{'operation':<24}{'calls':>6}{'wall ms':>12}{'max ms':>12}{'cpu ms':>12}{'peak KiB':>12}\n")
+        for label, row in self.summary().items():
+            peak = f"{row['peak'] / 1024:.1f}" if row["peak"] is not None else "-"
+            out.write(f"{label:<24}{row['calls']:>6}{row['wall'] * 1000:>12.3f}{row['max_wall'] * 1000:>12.3f}"
+                      f"{row['cpu'] * 1000:>12.3f}{peak:>12}\n")
+
+        out.write(f"\ncProfile (top {self.top} by cumulative time)\n")
+        try:
+            stats = pstats.Stats(self.profile, stream=out)
+        except TypeError:
+            out.write("no profiled calls recorded\n")
+        else:
+            stats.sort_stats("cumulative").print_stats(self.top)
+            self.profile.dump_stats(self.report_path.with_suffix(".prof"))
+
+        self.report_path.write_text(out.getvalue())
+        return self.report_path
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache for query results with generation-based invalidation.
+
+    Every mutation calls ``invalidate``, which only bumps a counter; entries
+    computed under an older generation are treated as misses and replaced the
+    next time they are asked for, so invalidation is O(1).
+
+    Safe to share between threads: the bookkeeping runs under a lock while
+    ``compute`` runs outside it, and a result is stored under the generation
+    it started in, so a write that lands mid-computation is never masked.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (generation, value)
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark every cached result as stale."""
+        with self._lock:
+            self.generation += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key`` or store the result of ``compute()``."""
+        with self._lock:
+            generation = self.generation
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                current = self._entries.get(key)
+                if current is None or current[0] <= generation:
+                    self._entries[key] = (generation, value)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters for monitoring the cache's effectiveness."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "generation": self.generation,
+        }
@@ -0,0 +1,215 @@
+import json
+import lzma
+import os
+import zlib
+from datetime import date, datetime, time
+from pathlib import Path
+
+from .json_array import iter_items
+
+CODECS = {
+    "lzma": (".json.xz", lzma.compress, lzma.decompress),
+    "zlib": (".json.z", lambda data: zlib.compress(data, 9), zlib.decompress),
+}
+
+MANIFEST_VERSION = 1
+
+
+def to_datetime(value, end=False):
+    """
+    Normalize an ISO string, date or datetime to a datetime. A bare date
+    (or date-only string such as "2024-03-31") used as the ``end`` of a range
+    covers the whole day.
+    """
+    if isinstance(value, str):
+        value = date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, time.max if end else time.min)
+    return value
+
+
+def month_of(entry):
+    """Return the ``YYYY-MM`` partition key of a rental entry."""
+    return to_datetime(entry["date"]).strftime("%Y-%m")
+
+
+def read_partition_file(path, codec=None):
+    """Decode one partition file: indented JSON, or compressed with ``codec`` once sealed."""
+    if codec is None:
+        return list(iter_items(path))
+    with open(path, "rb") as f:
+        return json.loads(CODECS[codec][2](f.read()))
+
+
+class RentalArchive:
+    """
+    Month-partitioned rental ledger stored under ``data/<directory>/``.
+
+    The current month is the hot partition, kept as plain indented JSON so it
+    can be rewritten cheaply. Older months are sealed: compressed once with
+    ``codec`` and never rewritten. ``manifest.json`` records per-partition
+    counts and min/max dates so range reads only open overlapping partitions.
+    """
+    def __init__(self, directory="rentals", codec="lzma"):
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec {codec!r}; expected one of {sorted(CODECS)}")
+        self.root = Path("data") / directory
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.manifest_path = self.root / "manifest.json"
+        self.manifest = self._read_manifest()
+
+    def exists(self):
+        """Return True once the archive has a manifest on disk."""
+        return self.manifest_path.exists()
+
+    def _read_manifest(self):
+        if not self.manifest_path.exists():
+            return {"version": MANIFEST_VERSION, "partitions": {}}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=4, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    @property
+    def partitions(self):
+        return self.manifest["partitions"]
+
+    @staticmethod
+    def current_month():
+        return datetime.today().strftime("%Y-%m")
+
+    def load_hot(self):
+        """Return the current month's entries, sealing any stale hot partitions first."""
+        self._seal_stale()
+        info = self.partitions.get(self.current_month())
+        if info is None:
+            return []
+        return self.read_partition(self.current_month())
+
+    def save_hot(self, entries):
+        """
+        Persist the hot partition. Entries that belong to an earlier month
+        (e.g. the session crossed midnight at month end) are moved into their
+        own partitions; the entries that stay hot are returned.
+        """
+        hot_month = self.current_month()
+        hot, spill = [], {}
+        for entry in entries:
+            month = month_of(entry)
+            if month == hot_month:
+                hot.append(entry)
+            else:
+                spill.setdefault(month, []).append(entry)
+
+        for month, moved in spill.items():
+            self._merge_sealed(month, moved)
+        self._write_partition(hot_month, hot, sealed=False)
+        self._seal_stale()
+        self._write_manifest()
+        return hot
+
+    def import_entries(self, entries):
+        """Partition an existing flat ledger (e.g. rentals.json) into the archive."""
+        by_month = {}
+        for entry in entries:
+            by_month.setdefault(month_of(entry), []).append(entry)
+
+        hot_month = self.current_month()
+        for month, items in by_month.items():
+            if month == hot_month:
+                self._write_partition(month, items, sealed=False)
+            else:
+                self._merge_sealed(month, items)
+        self._write_manifest()
+
+    def read_partition(self, month):
+        """Decode every entry of one partition."""
+        info = self.partitions[month]
+        return read_partition_file(self.root / info["file"], info["codec"] if info["sealed"] else None)
+
+    def months(self, start=None, end=None, sealed_only=False):
+        """Partition keys (oldest first) whose date span overlaps ``[start, end]``."""
+        start = to_datetime(start) if start is not None else None
+        end = to_datetime(end, end=True) if end is not None else None
+        selected = []
+        for month in sorted(self.partitions):
+            info = self.partitions[month]
+            if not info["count"] or (sealed_only and not info["sealed"]):
+                continue
+            if start is not None and to_datetime(info["max_date"]) < start:
+                continue
+            if end is not None and to_datetime(info["min_date"]) > end:
+                continue
+            selected.append(month)
+        return selected
+
+    def iter_entries(self, start=None, end=None, reverse=True, sealed_only=False):
+        """Yield entries in ``[start, end]``, opening only overlapping partitions."""
+        start_dt = to_datetime(start) if start is not None else None
+        end_dt = to_datetime(end, end=True) if end is not None else None
+        months = self.months(start, end, sealed_only)
+        for month in (reversed(months) if reverse else months):
+            entries = self.read_partition(month)
+            for entry in (reversed(entries) if reverse else entries):
+                when = to_datetime(entry["date"])
+                if (start_dt is None or when >= start_dt) and (end_dt is None or when <= end_dt):
+                    yield entry
+
+    def _merge_sealed(self, month, entries):
+        """
+        Add entries to a sealed partition. An unsealed partition is a former
+        hot month whose entries the caller already holds, so it is replaced.
+        """
+        old = None
+        if month in self.partitions:
+            info = self.partitions[month]
+            if info["sealed"]:
+                entries = self.read_partition(month) + entries
+            old = self.root / info["file"]
+        self._write_partition(month, entries, sealed=True)
+        new = self.root / self.partitions[month]["file"]
+        if old is not None and old != new:
+            old.unlink(missing_ok=True)
+
+    def _seal_stale(self):
+        """Compress every unsealed partition older than the current month."""
+        hot_month = self.current_month()
+        stale = [m for m, info in self.partitions.items() if not info["sealed"] and m < hot_month]
+        for month in stale:
+            entries = self.read_partition(month)
+            plain = self.root / self.partitions[month]["file"]
+            self._write_partition(month, entries, sealed=True)
+            plain.unlink(missing_ok=True)
+        if stale:
+            self._write_manifest()
+
+    def _write_partition(self, month, entries, sealed):
+        """Write one partition file and refresh its manifest entry."""
+        if sealed:
+            suffix, compress, _ = CODECS[self.codec]
+            payload = compress(json.dumps(entries, separators=(",", ":")).encode("utf-8"))
+            name = month + suffix
+        else:
+            payload = json.dumps(entries, indent=4).encode("utf-8")
+            name = month + ".json"
+
+        path = self.root / name
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+
+        dates = [to_datetime(e["date"]) for e in entries]
+        self.partitions[month] = {
+            "file": name,
+            "sealed": sealed,
+            "codec": self.codec if sealed else None,
+            "count": len(entries),
+            "min_date": min(dates).isoformat() if dates else None,
+            "max_date": max(dates).isoformat() if dates else None,
+        }
@@ -0,0 +1,174 @@
+from collections import Counter
+
+
+def normalize(text):
+    """Case- and whitespace-insensitive form used for every indexed term."""
+    return " ".join(str(text).casefold().split())
+
+
+def trigrams(term):
+    """Padded character trigrams of ``term`` ("toy" -> "  t", " to", "toy", "oy ")."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a, b, limit):
+    """
+    Levenshtein distance between ``a`` and ``b``, or None once it is known to
+    exceed ``limit``. Only a band of width ``2 * limit + 1`` is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    big = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [big] * (len(b) + 1)
+        current[0] = i if i <= limit else big
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            current[j] = min(cost, previous[j] + 1, current[j - 1] + 1, big)
+        if min(current[low - 1:high + 1]) > limit:
+            return None
+        previous = current
+    return previous[len(b)] if previous[len(b)] <= limit else None
+
+
+def default_limit(term):
+    """Edits tolerated for a query word: none for 1-2 letters, 1 up to 5, then 2."""
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+class _Node:
+    __slots__ = ("children", "term")
+
+    def __init__(self):
+        self.children = {}
+        self.term = None
+
+
+class SearchIndex:
+    """
+    Prefix and fuzzy search over the brand and model of a fleet.
+
+    Every brand, model and model word is a term. Terms live in a trie for
+    prefix completion and in a trigram index for typo tolerance; each term
+    maps to the positions of the vehicles carrying it. A lookup costs the
+    query length plus the number of distinct matching terms, not the fleet
+    size. Positions index the fleet sequence the index was built from.
+    """
+    def __init__(self, vehicles):
+        self.vehicles = vehicles
+        self.root = _Node()
+        self.postings = {}  # term -> vehicle positions, ascending
+        self.grams = {}     # trigram -> terms containing it
+        for position, vehicle in enumerate(vehicles):
+            for term in self._terms(vehicle):
+                self._add(term, position)
+
+    @staticmethod
+    def _terms(vehicle):
+        brand, model = normalize(vehicle.brand), normalize(vehicle.model)
+        terms = {brand, model, *model.split()}
+        terms.discard("")
+        return terms
+
+    def _add(self, term, position):
+        postings = self.postings.get(term)
+        if postings is None:
+            postings = self.postings[term] = []
+            node = self.root
+            for char in term:
+                node = node.children.setdefault(char, _Node())
+            node.term = term
+            for gram in trigrams(term):
+                self.grams.setdefault(gram, []).append(term)
+        if not postings or postings[-1] != position:
+            postings.append(position)
+
+    def complete(self, prefix, limit=10):
+        """Return up to ``limit`` indexed terms starting with ``prefix``, shortest first."""
+        node = self.root
+        for char in normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        found = []
+        level = [node]
+        while level and len(found) < limit:
+            found.extend(sorted(n.term for n in level if n.term is not None))
+            level = [child for n in level for _, child in sorted(n.children.items())]
+        return found[:limit]
+
+    def prefix_terms(self, prefix):
+        """Every indexed term starting with ``prefix``."""
+        return self.complete(prefix, limit=len(self.postings))
+
+    def fuzzy_terms(self, word, limit=None):
+        """
+        Terms within ``limit`` edits of ``word`` (or of one of its prefixes of
+        the same length, so "corol" still finds "corolla") as (distance, term).
+        """
+        word = normalize(word)
+        limit = default_limit(word) if limit is None else limit
+        if limit == 0:
+            return []
+        grams = trigrams(word)
+        shared = Counter(term for gram in grams for term in self.grams.get(gram, ()))
+        # q-gram lemma: every edit destroys at most three of the word's trigrams,
+        # plus the word's end-padding gram when it matches a prefix
+        needed = len(grams) - 3 * limit - 1
+        matches = []
+        for term, count in shared.items():
+            if count < needed:
+                continue
+            distance = bounded_distance(word, term, limit)
+            if distance is None and len(term) > len(word):
+                distance = bounded_distance(word, term[:len(word)], limit)
+            if distance is not None:
+                matches.append((distance, term))
+        return sorted(matches)
+
+    def positions(self, query, fuzzy=True):
+        """
+        Fleet positions matching every word of ``query``, best first. A word
+        matches by prefix; with ``fuzzy`` it falls back to near misses.
+        """
+        scores = None
+        for word in normalize(query).split():
+            ranked = {}
+            for term in self.prefix_terms(word):
+                for position in self.postings[term]:
+                    ranked[position] = 0
+            if not ranked and fuzzy:
+                for distance, term in self.fuzzy_terms(word):
+                    for position in self.postings[term]:
+                        ranked.setdefault(position, distance)
+            if scores is None:
+                scores = ranked
+            else:
+                scores = {p: scores[p] + d for p, d in ranked.items() if p in scores}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda p: (scores[p], p))
+
+    def search(self, query, available=None, fuzzy=True, limit=None):
+        """
+        Return matching vehicles, best first. ``available`` keeps only free
+        (True) or rented (False) vehicles; ``limit`` caps the result count.
+        """
+        results = []
+        for position in self.positions(query, fuzzy):
+            vehicle = self.vehicles[position]
+            if available is not None and vehicle.available != available:
+                continue
+            results.append(vehicle)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
@@ -10,6 +10,8 @@ from unittest.mock import MagicMock, patch
 from src.vehicle_rental_system.models.car import Car
 from src.vehicle_rental_system.models.bike import Bike
 from src.vehicle_rental_system.models.truck import Truck
+from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
+from src.vehicle_rental_system.services.rental_service import RentalService
 
 
 @pytest.fixture
@@ -35,3 +37,48 @@ def sample_vehicles(sample_car, sample_bike, sample_truck):
     """Fixture providing a list of sample vehicles."""
     return [sample_car, sample_bike, sample_truck]
 
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Fixture switching into a temp directory with an empty data/ folder."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "data"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def write_data(data_dir):
+    """
+    Fixture returning a writer for data/vehicles.json (and data/rentals.json
+    when ``rentals`` is given) in FileHandler's indented layout. Vehicles may
+    be full records or bare ids, which become Toyota Corolla cars; ids in
+    ``rented`` are marked unavailable.
+    """
+    def write(vehicles=(), rentals=None, rented=()):
+        rented = set(rented)
+        records = [
+            v if isinstance(v, dict) else
+            {"vehicle_id": v, "type": "Car", "brand": "Toyota", "model": "Corolla",
+             "base_price": 1000.0, "available": v not in rented}
+            for v in vehicles
+        ]
+        with open(data_dir / "vehicles.json", "w") as f:
+            json.dump(records, f, indent=4)
+        if rentals is not None:
+            with open(data_dir / "rentals.json", "w") as f:
+                json.dump(rentals, f, indent=4)
+        return data_dir
+    return write
+
+
+@pytest.fixture
+def services(request, write_data):
+    """
+    Fixture building a real (VehicleManager, RentalService) pair over cars
+    1-3. Parametrize it indirectly with ``write_data`` arguments to change
+    the dataset.
+    """
+    write_data(**getattr(request, "param", {"vehicles": (1, 2, 3)}))
+    manager = VehicleManager()
+    return manager, RentalService(manager)
@@ -0,0 +1,49 @@
+"""
+Tests for the CLI entry point in main.py.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestStartup:
+    """Test that the CLI defers its imports and data loading."""
+
+    def test_importing_main_skips_services_and_diagnostics(self):
+        """Test that no service, metrics or profiling module is imported up front."""
+        code = (
+            "import sys, main; "
+            "print([m for m in sys.modules if m.startswith('src.vehicle_rental_system.services') "
+            "or m.endswith(('.metrics', '.profiling')) or m == 'cProfile'])"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                text=True, check=True)
+        assert result.stdout.strip() == "[]"
+
+    def test_services_load_on_first_use(self, tmp_path, monkeypatch):
+        """Test that nothing is read or created until the services are needed."""
+        monkeypatch.chdir(tmp_path)
+        services = main.DeferredServices(background=False)
+        assert not (tmp_path / "data").exists()
+
+        vehicle_manager, rental_service = services.get()
+        assert services.rental_service is rental_service
+        assert vehicle_manager.vehicles == []
+        assert (tmp_path / "data" / "vehicles.json").exists()
+
+    def test_background_load_is_shared(self, tmp_path, monkeypatch):
+        """Test that get() returns the pair loaded by the background thread."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "vehicles.json").write_text(json.dumps([
+            {"vehicle_id": 1, "type": "Car", "brand": "Toyota", "model": "Corolla",
+             "base_price": 1000.0, "available": True}
+        ]))
+        services = main.DeferredServices()
+        assert services.get() is services.get()
+        assert services.vehicle_manager.get_vehicle_by_id(1).brand == "Toyota"
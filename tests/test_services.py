@@ -6,11 +6,15 @@ import json
 import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytest
 
 from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
 from src.vehicle_rental_system.services.rental_service import RentalService
+from src.vehicle_rental_system.services.sharded_fleet import ShardedFleet, split_dataset
+from src.vehicle_rental_system.services.due_tracker import DueTracker
+from src.vehicle_rental_system.services.occupancy import OccupancyCalendar
+from src.vehicle_rental_system.services.reconciler import reconcile, main as reconcile_main
 from src.vehicle_rental_system.models.car import Car
 from src.vehicle_rental_system.models.bike import Bike
 from src.vehicle_rental_system.models.truck import Truck
@@ -151,6 +155,55 @@ class TestVehicleManager:
             assert "base_price" in first_item
             assert "available" in first_item
 
+    def test_listing_queries_are_cached_until_save(self, vehicle_manager):
+        """Test that repeated listings hit the cache and saves invalidate it."""
+        first = vehicle_manager.list_available()
+        second = vehicle_manager.list_available()
+        assert first == second
+        assert vehicle_manager.query_cache.stats()["hits"] == 1
+
+        first[0].available = False
+        vehicle_manager.save_vehicles()
+        assert first[0] not in vehicle_manager.list_available()
+
+    def test_reassigning_vehicles_invalidates_cache(self, vehicle_manager):
+        """Test that replacing the vehicle list is never served stale results."""
+        vehicle_manager.list_rented()
+        vehicle_manager.vehicles = []
+        assert vehicle_manager.list_rented() == []
+
+    def test_suggest_alternatives_ranks_type_then_brand_by_price(self, vehicle_manager):
+        """Test tiered, price-ranked replacements that skip rented vehicles."""
+        wanted = Car(10, "Toyota", "Corolla", 1000, available=False)
+        vehicle_manager.vehicles = [
+            wanted,
+            Car(11, "Honda", "Civic", 1050),
+            Car(12, "Toyota", "Yaris", 2000),
+            Car(13, "Toyota", "Camry", 990, available=False),
+            Truck(14, "Toyota", "Hilux", 800),
+            Car(15, "Kia", "Rio", 500),
+        ]
+
+        suggested = vehicle_manager.suggest_alternatives(wanted, k=4)
+
+        assert [v.vehicle_id for v in suggested] == [12, 11, 15, 14]
+        assert vehicle_manager.suggest_alternatives(wanted, k=1)[0].vehicle_id == 12
+
+    def test_iter_vehicles_filters_lazily(self, vehicle_manager):
+        """Test the generator behind the paged CLI listings."""
+        vehicles = vehicle_manager.iter_vehicles(available=True)
+        assert next(vehicles).vehicle_id == 1
+        assert [v.vehicle_id for v in vehicle_manager.iter_vehicles(available=False)] == [3]
+        assert [v.vehicle_id for v in vehicle_manager.iter_vehicles(brand="YAMAHA", vehicle_type="bike")] == [2]
+
+    def test_search_matches_prefixes_and_typos(self, vehicle_manager):
+        """Test brand/model search with prefix, typo and availability filter."""
+        assert [v.vehicle_id for v in vehicle_manager.search("toy")] == [1]
+        assert [v.vehicle_id for v in vehicle_manager.search("corola")] == [1]
+        assert [v.vehicle_id for v in vehicle_manager.search("ford f")] == [3]
+        assert vehicle_manager.search("ford", available=True) == []
+        assert vehicle_manager.complete("f") == ["ford", "f-150"]
+
 
 class TestRentalService:
     """Test the RentalService class."""
@@ -223,6 +276,17 @@ class TestRentalService:
         
         assert "already rented" in result.lower() or "not available" in result.lower()
 
+    def test_rent_conflict_lists_alternatives(self, rental_service):
+        """Test that a conflict response can carry suggested replacements."""
+        manager = rental_service.vehicle_manager
+        manager.suggest_alternatives.return_value = [manager.vehicles[0]]
+
+        result = rental_service.rent_vehicle("John Doe", 3, 5, alternatives=2)
+
+        manager.suggest_alternatives.assert_called_once_with(manager.vehicles[2], 2)
+        assert "already rented" in result
+        assert "Available alternatives: 1 (Car Toyota Corolla, 12000.0/day)." in result
+
     def test_rent_vehicle_calculates_cost_correctly(self, rental_service):
         """Test that rental cost is calculated correctly."""
         rental_service.rent_vehicle("Test User", 1, 3)
@@ -367,3 +431,557 @@ class TestRentalService:
         assert history[0]["renter"] == "User2"
         assert history[-1]["renter"] == "User1"
 
+    def test_iter_rent_history_matches_sorted_history(self, rental_service):
+        """Test that the lazy history yields the get_rent_history order."""
+        rental_service.rentals = [
+            {"renter": name, "vehicle_id": "1", "days": 1, "cost": 1, "date": date}
+            for name, date in [("A", "2024-03-01T09:00:00"), ("B", "2024-01-01T09:00:00"),
+                               ("C", "2024-03-01T09:00:00"), ("D", "2024-02-01T09:00:00.5")]
+        ]
+        for reverse in (True, False):
+            lazy = [r["renter"] for r in rental_service.iter_rent_history(reverse=reverse)]
+            assert lazy == [r["renter"] for r in rental_service.get_rent_history(reverse=reverse)]
+
+        history = rental_service.iter_rent_history()
+        assert next(history)["renter"] == "A"
+
+    def test_iter_rent_history_streams_a_date_ordered_ledger(self, rental_service, monkeypatch):
+        """Test that an in-order ledger is yielded without the heap, ties in ledger order."""
+        rental_service.rentals = [
+            {"renter": name, "vehicle_id": "1", "days": 1, "cost": 1, "date": date}
+            for name, date in [("A", "2024-01-01T09:00:00"), ("B", "2024-02-01T09:00:00"),
+                               ("C", "2024-02-01T09:00:00"), ("D", "2024-03-01T09:00:00")]
+        ]
+        monkeypatch.setattr("heapq.heapify", Mock(side_effect=AssertionError("heap used")))
+
+        for reverse in (True, False):
+            lazy = [r["renter"] for r in rental_service.iter_rent_history(reverse=reverse)]
+            assert lazy == [r["renter"] for r in rental_service.get_rent_history(reverse=reverse)]
+
+
+
+class TestLazyVehicleManager:
+    """Test VehicleManager in lazy mode against real files."""
+
+    @pytest.fixture
+    def lazy_manager(self, write_data):
+        """Fixture writing a fleet to a temp data/ dir and opening it lazily."""
+        write_data([
+            {"vehicle_id": i, "type": ["Car", "Bike", "Truck"][i % 3], "brand": "Brand",
+             "model": f"Model {i}", "base_price": 1000.0 + i, "available": i % 4 != 0}
+            for i in range(1, 21)
+        ])
+        manager = VehicleManager(lazy=True, cache_size=4)
+        yield manager
+        manager.vehicles.close()
+
+    def test_lazy_manager_does_not_materialize_on_startup(self, lazy_manager):
+        """Test that no vehicles are built until one is requested."""
+        assert len(lazy_manager.vehicles) == 20
+        assert len(lazy_manager.vehicles._cache) == 0
+
+    def test_lazy_get_vehicle_by_id(self, lazy_manager):
+        """Test that lookups use the index and accept string IDs."""
+        vehicle = lazy_manager.get_vehicle_by_id("7")
+        assert vehicle.vehicle_id == 7
+        assert vehicle.model == "Model 7"
+        assert lazy_manager.get_vehicle_by_id(999) is None
+
+    def test_lazy_cache_respects_budget(self, lazy_manager):
+        """Test that scans never keep more than cache_size vehicles."""
+        available = lazy_manager.list_available()
+        assert len(available) == 15
+        assert len(lazy_manager.vehicles._cache) <= 4
+
+    def test_lazy_changes_survive_eviction_and_save(self, lazy_manager, tmp_path):
+        """Test that an evicted, modified vehicle is still persisted."""
+        lazy_manager.get_vehicle_by_id(1).available = True
+        lazy_manager.list_rented()  # pushes vehicle 1 out of the cache
+        lazy_manager.save_vehicles()
+
+        with open(tmp_path / "data" / "vehicles.json") as f:
+            data = json.load(f)
+        assert data[0]["available"] is True
+        assert data[0]["base_price"] == 1001.0
+        assert lazy_manager.get_vehicle_by_id(1).available is True
+
+    def test_unknown_types_do_not_shift_positions(self, write_data):
+        """Test that a skipped record leaves indexing, search and alternatives aligned."""
+        write_data([
+            {"vehicle_id": 1, "type": "Van", "brand": "Ford", "model": "Transit",
+             "base_price": 3000.0, "available": True},
+            2,
+            {"vehicle_id": 3, "type": "Bike", "brand": "Yamaha", "model": "MT-07",
+             "base_price": 5000.0, "available": True},
+            4,
+        ])
+        manager = VehicleManager(lazy=True)
+
+        assert len(manager.vehicles) == 3
+        assert [v.vehicle_id for v in manager.search("toyota")] == [2, 4]
+        assert [v.vehicle_id for v in manager.search("yamaha")] == [3]
+        assert [v.vehicle_id for v in manager.suggest_alternatives(manager.get_vehicle_by_id(2))] == [4]
+        assert manager.get_vehicle_by_id(1) is None
+        manager.vehicles.close()
+
+    def test_lazy_and_eager_listings_match(self, lazy_manager):
+        """Test that lazy mode returns the same vehicles in the same order."""
+        eager = VehicleManager()
+        assert [v.vehicle_id for v in lazy_manager.list_rented()] == \
+            [v.vehicle_id for v in eager.list_rented()]
+
+
+class TestBinaryVehicleManager:
+    """Test VehicleManager backed by the binary fleet snapshot."""
+
+    def test_binary_manager_persists_flags_in_place(self, write_data):
+        """Test conversion on first load and in-place availability saves."""
+        data_dir = write_data([
+            1,
+            {"vehicle_id": 2, "type": "Bike", "brand": "Yamaha", "model": "MT-07",
+             "base_price": 5000.0, "available": True},
+        ])
+
+        manager = VehicleManager(binary=True)
+        assert (data_dir / "vehicles.snap").exists()
+        manager.get_vehicle_by_id(2).available = False
+        manager.save_vehicles()
+        manager.snapshot.close()
+
+        reopened = VehicleManager(binary=True)
+        assert [v.vehicle_id for v in reopened.list_rented()] == [2]
+        assert reopened.get_vehicle_by_id(2).price_per_day == 4000.0
+        reopened.snapshot.close()
+
+    def test_binary_and_eager_sessions_share_one_fleet(self, write_data):
+        """Test that binary saves reach vehicles.json, so no mode loses another's rentals."""
+        data_dir = write_data([
+            {"vehicle_id": 9, "type": "Van", "brand": "Ford", "model": "Transit",
+             "base_price": 3000.0, "available": True},
+            1, 2,
+        ])
+        binary = VehicleManager(binary=True)
+        assert [v.vehicle_id for v in binary.vehicles] == [1, 2]
+        RentalService(binary).rent_vehicle("Alice", 1, 2)
+        binary.snapshot.close()
+
+        eager = VehicleManager()
+        assert "already rented" in RentalService(eager).rent_vehicle("Bob", 1, 1)
+        RentalService(eager).rent_vehicle("Bob", 2, 1)
+
+        reopened = VehicleManager(binary=True)
+        assert [v.vehicle_id for v in reopened.list_rented()] == [1, 2]
+        reopened.snapshot.close()
+        assert "Van" not in (data_dir / "vehicles.json").read_text()
+
+    def test_binary_manager_rebuilds_stale_snapshot(self, write_data):
+        """Test that a vehicles.json written after the conversion replaces the snapshot."""
+        write_data((3, 1, 2))
+        VehicleManager(binary=True).snapshot.close()
+
+        write_data((3, 1, 2), rented=[1])
+        manager = VehicleManager(binary=True)
+
+        assert [v.vehicle_id for v in manager.list_rented()] == [1]
+        assert manager.get_vehicle_by_id("2") is manager.vehicles[2]
+        assert manager.get_vehicle_by_id(9) is None
+        manager.get_vehicle_by_id(3).available = False
+        manager.save_vehicles([manager.get_vehicle_by_id(3)])
+        assert manager.snapshot.is_available(0) is False
+        manager.snapshot.close()
+
+
+class TestStreamingRentalService:
+    """Test RentalService in streaming mode against a real ledger file."""
+
+    @pytest.fixture
+    def streaming_service(self, data_dir):
+        """Fixture creating a streaming RentalService over a temp data/ dir."""
+        manager = Mock()
+        vehicles = {i: Car(i, "Toyota", "Corolla", 1000) for i in range(1, 4)}
+        manager.get_vehicle_by_id.side_effect = vehicles.get
+        return RentalService(manager, streaming=True)
+
+    def test_streaming_service_does_not_load_ledger(self, streaming_service):
+        """Test that the ledger is not held in memory."""
+        assert streaming_service.rentals is None
+
+    def test_streaming_rentals_are_appended_to_disk(self, streaming_service, tmp_path):
+        """Test that each rental lands in rentals.json immediately."""
+        streaming_service.rent_vehicle("Alice", 1, 2)
+        streaming_service.rent_vehicle("Bob", 2, 1)
+
+        with open(tmp_path / "data" / "rentals.json") as f:
+            ledger = json.load(f)
+        assert [r["renter"] for r in ledger] == ["Alice", "Bob"]
+
+    def test_iter_history_yields_newest_first(self, streaming_service):
+        """Test generator-based history in both directions."""
+        for vid, name in [(1, "Alice"), (2, "Bob"), (3, "Carol")]:
+            streaming_service.rent_vehicle(name, vid, 1)
+
+        history = streaming_service.iter_history()
+        assert next(history)["renter"] == "Carol"
+        assert [r["renter"] for r in streaming_service.iter_history(reverse=False)] == ["Alice", "Bob", "Carol"]
+        assert len(streaming_service.get_rent_history()) == 3
+
+
+class TestArchivedRentalService:
+    """Test RentalService backed by the month-partitioned archive."""
+
+    def test_archive_imports_ledger_and_serves_history(self, write_data):
+        """Test migration, hot-only memory and range-limited history."""
+        write_data(rentals=[
+            {"renter": "Old1", "vehicle_id": 1, "days": 1, "cost": 1, "date": "2024-01-10T09:00:00"},
+            {"renter": "Old2", "vehicle_id": 2, "days": 1, "cost": 1, "date": "2024-02-10T09:00:00"},
+        ])
+
+        manager = Mock()
+        manager.get_vehicle_by_id.side_effect = {1: Car(1, "Toyota", "Corolla", 1000)}.get
+        service = RentalService(manager, archive="lzma")
+        assert service.rentals == []
+
+        service.rent_vehicle("New", 1, 2)
+        reopened = RentalService(manager, archive="lzma")
+
+        assert [r["renter"] for r in reopened.rentals] == ["New"]
+        assert [r["renter"] for r in reopened.get_rent_history()] == ["New", "Old2", "Old1"]
+        assert [r["renter"] for r in reopened.get_rent_history(start="2024-02-01", end="2024-02-28")] == ["Old2"]
+
+
+class TestShardedFleet:
+    """Test per-branch sharding with routed writes and fan-out reads."""
+
+    @pytest.fixture
+    def sharded_data(self, write_data):
+        """Fixture writing a two-branch dataset and splitting it into shards."""
+        vehicles = [
+            {"vehicle_id": 1, "type": "Car", "brand": "Toyota", "model": "Corolla",
+             "base_price": 10000.0, "available": True, "branch": "kigali"},
+            {"vehicle_id": 2, "type": "Bike", "brand": "Yamaha", "model": "MT-07",
+             "base_price": 5000.0, "available": True, "branch": "musanze"},
+            {"vehicle_id": 3, "type": "Truck", "brand": "Toyota", "model": "Hilux",
+             "base_price": 20000.0, "available": False, "branch": "musanze"},
+        ]
+        rentals = [
+            {"renter": "A", "vehicle_id": 3, "days": 1, "cost": 1, "date": "2024-01-01T10:00:00"},
+            {"renter": "B", "vehicle_id": 1, "days": 1, "cost": 1, "date": "2024-01-02T10:00:00"},
+        ]
+        write_data(vehicles, rentals)
+        return split_dataset()
+
+    def test_split_and_parallel_load(self, sharded_data, tmp_path):
+        """Test that every shard gets its own files and is loaded."""
+        assert sharded_data == ["kigali", "musanze"]
+        assert (tmp_path / "data" / "branches" / "musanze" / "rentals.json").exists()
+
+        fleet = ShardedFleet(workers=2)
+        assert fleet.shard_of(2) == "musanze"
+        assert sorted(v.vehicle_id for v in fleet.list_available()) == [1, 2]
+        assert [v.vehicle_id for v in fleet.get_vehicles_by_brand("toyota")] == [1, 3]
+
+    def test_rentals_are_routed_to_the_owning_shard(self, sharded_data, tmp_path):
+        """Test that a rental only touches its vehicle's shard files."""
+        fleet = ShardedFleet(workers=1)
+        result = fleet.rent_vehicle("C", 2, 2)
+
+        assert "successfully rented" in result
+        with open(tmp_path / "data" / "branches" / "musanze" / "rentals.json") as f:
+            assert [r["renter"] for r in json.load(f)] == ["A", "C"]
+        with open(tmp_path / "data" / "branches" / "kigali" / "rentals.json") as f:
+            assert [r["renter"] for r in json.load(f)] == ["B"]
+        assert "No vehicle found" in fleet.rent_vehicle("C", 99, 1)
+
+    def test_history_is_merged_across_shards(self, sharded_data):
+        """Test that cross-shard history is globally date-sorted."""
+        fleet = ShardedFleet(workers=1)
+        assert [r["renter"] for r in fleet.get_rent_history()] == ["B", "A"]
+        assert [r["renter"] for r in fleet.iter_history(reverse=False)] == ["A", "B"]
+
+    def test_duplicate_ids_across_shards_are_rejected(self, sharded_data, tmp_path):
+        """Test that a vehicle may only live in one shard."""
+        path = tmp_path / "data" / "branches" / "kigali" / "vehicles.json"
+        records = json.loads(path.read_text())
+        records.append(dict(records[0], vehicle_id=2))
+        path.write_text(json.dumps(records, indent=4))
+
+        with pytest.raises(ValueError):
+            ShardedFleet(workers=1)
+
+
+class TestReadViews:
+    """Test copy-on-write point-in-time views of fleet and ledger."""
+
+    def test_view_is_unaffected_by_later_rentals(self, services):
+        """Test that rents and returns after the view do not show through it."""
+        manager, service = services
+        service.rent_vehicle("Alice", 1, 2)
+        view = service.read_view()
+
+        service.rent_vehicle("Bob", 2, 1)
+        service.return_vehicle(1)
+
+        assert [v.vehicle_id for v in view.vehicles.list_rented()] == [1]
+        assert [r["renter"] for r in view.rentals] == ["Alice"]
+        assert [v.vehicle_id for v in manager.list_rented()] == [2]
+
+    def test_views_only_copy_changed_flags(self, services):
+        """Test that each view records just the vehicles changed after it."""
+        manager, service = services
+        first = service.read_view()
+        service.rent_vehicle("Alice", 1, 2)
+        second = service.read_view()
+        service.rent_vehicle("Bob", 2, 1)
+
+        assert first.vehicles._before == {id(manager.vehicles[0]): True, id(manager.vehicles[1]): True}
+        assert second.vehicles._before == {id(manager.vehicles[1]): True}
+        assert second.vehicles.get_vehicle_by_id(1).available is False
+
+    def test_dropped_views_stop_tracking(self, services):
+        """Test that writers stop paying for views nobody holds."""
+        manager, service = services
+        service.read_view()
+        assert len(manager.views) == 0
+
+    def test_streaming_ledger_view(self, services):
+        """Test that a streamed ledger view stops at its byte length."""
+        manager, _ = services
+        service = RentalService(manager, streaming=True)
+        service.rent_vehicle("Alice", 1, 1)
+        view = service.read_view()
+        service.rent_vehicle("Bob", 2, 1)
+
+        assert [r["renter"] for r in view.rentals] == ["Alice"]
+        assert len(view.rentals) == 1
+
+
+class TestIdempotentRequests:
+    """Test idempotency keys on rents and returns."""
+
+    def test_retried_rent_is_answered_from_cache(self, services):
+        """Test that a retry returns the first response and writes nothing."""
+        _, service = services
+        first = service.rent_vehicle("Alice", 1, 2, idempotency_key="req-1")
+        retry = service.rent_vehicle("Alice", 1, 2, idempotency_key="req-1")
+
+        assert "successfully rented" in first
+        assert retry == first
+        assert len(service.rentals) == 1
+
+    def test_key_reused_for_another_request_is_rejected(self, services):
+        """Test that one key cannot stand for two different requests."""
+        _, service = services
+        service.rent_vehicle("Alice", 1, 2, idempotency_key="req-1")
+        result = service.rent_vehicle("Alice", 2, 2, idempotency_key="req-1")
+
+        assert "already used for a different request" in result
+        assert len(service.rentals) == 1
+
+    def test_keys_survive_a_restart(self, services, data_dir):
+        """Test that keys are saved next to the ledger and reloaded."""
+        manager, service = services
+        first = service.return_vehicle(1, idempotency_key="ret-1")
+        service.rent_vehicle("Alice", 1, 2)
+        assert (data_dir / "rentals.idempotency.json").exists()
+
+        restarted = RentalService(VehicleManager())
+        assert restarted.return_vehicle(1, idempotency_key="ret-1") == first
+        assert restarted.vehicle_manager.get_vehicle_by_id(1).available is False
+
+
+class TestDueTracker:
+    """Test the due-date heap of open rentals."""
+
+    @staticmethod
+    def entry(vehicle_id, date, days):
+        return {"renter": f"R{vehicle_id}", "vehicle_id": vehicle_id, "days": days, "cost": 1, "date": date}
+
+    def test_overdue_and_upcoming_in_due_order(self):
+        """Test that queries return rentals ordered by due time."""
+        tracker = DueTracker([
+            self.entry(1, "2024-01-01T10:00:00", 5),   # due Jan 6
+            self.entry(2, "2024-01-01T10:00:00", 1),   # due Jan 2
+            self.entry(3, "2024-01-09T10:00:00", 1),   # due Jan 10
+            self.entry(4, "2024-01-10T09:00:00", 3),   # due Jan 13
+        ])
+        now = datetime(2024, 1, 9, 12)
+
+        assert [e["vehicle_id"] for _, e in tracker.overdue(now)] == [2, 1]
+        assert [e["vehicle_id"] for _, e in tracker.overdue(now, limit=1)] == [2]
+        assert [e["vehicle_id"] for _, e in tracker.upcoming(timedelta(days=1), now)] == [3]
+
+    def test_returned_rentals_are_skipped_and_compacted(self):
+        """Test lazy deletion and the rebuild once most slots are stale."""
+        tracker = DueTracker(self.entry(i, "2024-01-01T10:00:00", i) for i in range(1, 41))
+        for i in range(1, 40):
+            tracker.remove(str(i))
+
+        assert len(tracker) == 1
+        assert len(tracker._heap) < 40
+        assert [e["vehicle_id"] for _, e in tracker.overdue(datetime(2025, 1, 1))] == [40]
+
+    def test_upcoming_skips_overdue_rentals(self):
+        """Test that overdue rentals move aside once and earlier queries still see them."""
+        tracker = DueTracker(
+            [self.entry(i, "2024-01-01T10:00:00", 1) for i in range(1, 101)]  # due Jan 2
+            + [self.entry(200, "2024-01-05T10:00:00", 1), self.entry(201, "2024-01-05T11:00:00", 1)]
+        )
+        now = datetime(2024, 1, 6, 9)
+
+        assert [e["vehicle_id"] for _, e in tracker.upcoming(timedelta(days=1), now, limit=1)] == [200]
+        assert len(tracker._heap) == 2 and len(tracker._expired) == 100
+        earlier = tracker.upcoming(timedelta(days=1), datetime(2024, 1, 2, 8))
+        assert len(earlier) == 100
+        assert len(tracker.overdue(now)) == 100
+
+    def test_service_tracks_rents_and_returns(self, write_data):
+        """Test that the service rebuilds open rentals and keeps them current."""
+        write_data((1, 2, 3), rented=[1], rentals=[
+            self.entry(1, "2024-01-01T10:00:00", 2),
+            self.entry(2, "2024-01-01T10:00:00", 2),  # already returned
+        ])
+        service = RentalService(VehicleManager())
+
+        assert [e["vehicle_id"] for _, e in service.overdue()] == [1]
+        service.rent_vehicle("Bob", 3, 1)
+        assert [e["vehicle_id"] for _, e in service.upcoming_returns(timedelta(days=2))] == [3]
+        service.return_vehicle(1)
+        assert service.overdue() == []
+
+    @pytest.mark.parametrize("prebuilt", [True, False])
+    def test_ids_are_matched_like_get_vehicle_by_id(self, write_data, prebuilt):
+        """Test that a rental made as "01" is closed by returning "1"."""
+        write_data((1, 2))
+        service = RentalService(VehicleManager())
+        later = datetime.now() + timedelta(days=5)
+        if prebuilt:
+            service.overdue(later)
+
+        service.rent_vehicle("Alice", "01", 1)
+        assert [e["vehicle_id"] for _, e in service.overdue(later)] == ["01"]
+        service.return_vehicle("1")
+        assert service.overdue(later) == []
+
+
+class TestOccupancyCalendar:
+    """Test the difference-array occupancy calendar."""
+
+    def test_counts_per_type_and_day(self):
+        """Test clipping to the range and per-type daily counts."""
+        types = {1: "Car", 2: "Car", 3: "Bike"}
+        entries = [
+            {"vehicle_id": 1, "days": 3, "date": "2024-03-30T10:00:00"},  # Mar 30 - Apr 1
+            {"vehicle_id": 2, "days": 2, "date": "2024-04-02T09:00:00"},  # Apr 2 - 3
+            {"vehicle_id": 3, "days": 10, "date": "2024-04-01T09:00:00"},
+            {"vehicle_id": 9, "days": 1, "date": "2024-04-01T09:00:00"},  # orphan
+        ]
+        calendar = OccupancyCalendar("2024-04-01", "2024-04-04", entries, types.get)
+
+        assert calendar.counts == {"Bike": [1, 1, 1, 1], "Car": [1, 1, 1, 0]}
+        assert calendar.on("2024-04-04") == {"Bike": 1, "Car": 0}
+        assert calendar.unmatched == 1
+        assert len(list(calendar.rows())) == 4
+
+    def test_service_caches_and_extends_calendars(self, write_data):
+        """Test that a cached range picks up new rentals without a rebuild."""
+        write_data([{"vehicle_id": 1, "type": "Truck", "brand": "Ford", "model": "F-150",
+                     "base_price": 1000.0, "available": True}])
+        service = RentalService(VehicleManager())
+        today = datetime.today().date()
+
+        calendar = service.occupancy(today, today + timedelta(days=6))
+        assert calendar.counts == {}
+        service.rent_vehicle("Alice", 1, 2)
+
+        assert service.occupancy(today, today + timedelta(days=6)) is calendar
+        assert calendar.counts["Truck"] == [1, 1, 0, 0, 0, 0, 0]
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_service_matches_ids_like_get_vehicle_by_id(self, write_data, lazy):
+        """Test that a rental stored as "01" counts for vehicle 1 instead of as unmatched."""
+        write_data((1, 2), rented=[1], rentals=[
+            {"customer": "Alice", "vehicle_id": "01", "days": 2, "cost": 2000.0, "date": "2024-04-01T10:00:00"},
+        ])
+        service = RentalService(VehicleManager(lazy=lazy))
+
+        calendar = service.occupancy("2024-04-01", "2024-04-03")
+        assert calendar.counts == {"Car": [1, 1, 0]}
+        assert calendar.unmatched == 0
+
+
+class TestReconciler:
+    """Test the fleet/ledger consistency checker."""
+
+    @pytest.fixture
+    def files(self, write_data):
+        """Fixture writing an inconsistent fleet and ledger in FileHandler's layout."""
+        recent = (datetime.now() - timedelta(days=1)).isoformat()
+        rentals = [{"customer": "Alice", "vehicle_id": i, "days": 2, "cost": 10000.0, "date": recent}
+                   for i in range(3, 31, 3) if i not in (12, 27)]
+        rentals.append({"customer": "Bob", "vehicle_id": "99", "days": 1, "cost": 1.0, "date": recent})
+        # 27's only rental ended long ago: its rent crashed before the ledger save
+        rentals.append({"customer": "Carol", "vehicle_id": 27, "days": 3, "cost": 1.0,
+                        "date": "2023-01-01T10:00:00"})
+        # every third car is rented; id 5 appears twice
+        data_dir = write_data(list(range(1, 31)) + [5], rentals, rented=range(3, 31, 3))
+        return data_dir / "vehicles.json", data_dir / "rentals.json"
+
+    @pytest.mark.parametrize("chunks", [1, 4, 50])
+    def test_reports_every_inconsistency(self, files, chunks):
+        """Test that duplicates, stale rented flags and orphans are found for any chunking."""
+        report = reconcile(*files, workers=1, chunks=chunks)
+
+        assert report["summary"] == {"vehicles": 31, "rentals": 10, "duplicate_ids": 1,
+                                     "rented_without_rental": 1, "rented_past_due": 1,
+                                     "orphan_vehicle_ids": 1}
+        actions = {(a["action"], a["vehicle_id"]) for a in report["actions"]}
+        assert actions == {("remove_duplicates", 5), ("mark_available", 12), ("mark_available", 27),
+                           ("review_orphan_rentals", 99)}
+
+    def test_grace_period_for_late_returns(self, files):
+        """Test that a rental only counts as stale once it ended more than grace_days ago."""
+        report = reconcile(*files, workers=1, now=datetime(2023, 1, 20))
+        assert report["summary"]["rented_past_due"] == 0
+
+    def test_binary_mode_flags_are_read_from_the_snapshot(self, files):
+        """Test that a fresh vehicles.snap is scanned in place of the JSON."""
+        manager = VehicleManager(binary=True)
+        manager.get_vehicle_by_id(1).available = False
+        manager.save_vehicles([manager.get_vehicle_by_id(1)])
+        manager.snapshot.close()
+
+        report = reconcile(*files, workers=1)
+        assert report["vehicles_file"].endswith("vehicles.snap")
+        assert ("mark_available", 1) in {(a["action"], a["vehicle_id"]) for a in report["actions"]}
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_archive_mode_scans_the_partitions(self, files, workers):
+        """Test that rentals made after the ledger moved into an archive are seen."""
+        service = RentalService(VehicleManager(), archive="zlib")
+        service.rent_vehicle("Dave", 1, 2)
+
+        report = reconcile(*files, workers=workers)
+        assert report["rentals_file"].endswith("rentals")
+        assert report["summary"]["rentals"] == 11
+        actions = {(a["action"], a["vehicle_id"]) for a in report["actions"]}
+        assert actions == {("remove_duplicates", 5), ("mark_available", 12), ("mark_available", 27),
+                           ("review_orphan_rentals", 99)}
+
+    def test_compact_files_and_worker_processes(self, files):
+        """Test that non-indented files and a process pool give the same plan."""
+        vehicles_path, rentals_path = files
+        rentals_path.write_text(json.dumps(json.loads(rentals_path.read_text())))
+
+        report = reconcile(vehicles_path, rentals_path, workers=2, chunks=8)
+        assert report["summary"]["rentals"] == 10
+        assert len(report["actions"]) == 4
+
+    def test_cli_writes_plan(self, files, tmp_path, capsys):
+        """Test the command line writes the repair plan and exits 1 when it is not empty."""
+        output = tmp_path / "plan.json"
+        code = reconcile_main(["--vehicles", str(files[0]), "--rentals", str(files[1]),
+                               "--workers", "1", "--output", str(output)])
+
+        assert code == 1
+        assert len(json.loads(output.read_text())["actions"]) == 4
+        assert "1 duplicate ids" in capsys.readouterr().out
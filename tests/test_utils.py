@@ -5,9 +5,24 @@ Tests file handling and helper utilities.
 import json
 import tempfile
 from pathlib import Path
+from datetime import date, datetime
 import pytest
 from src.vehicle_rental_system.utils.file_handler import FileHandler
-from src.vehicle_rental_system.utils.helpers import pause
+from src.vehicle_rental_system.utils.helpers import pause, show_pages
+from src.vehicle_rental_system.utils.profiling import SessionProfiler
+from src.vehicle_rental_system.utils import metrics
+from src.vehicle_rental_system.utils.rental_archive import RentalArchive
+from src.vehicle_rental_system.utils.json_array import append_element, iter_elements, iter_items
+from src.vehicle_rental_system.utils.offset_index import OffsetIndex
+from src.vehicle_rental_system.utils.query_cache import QueryCache
+from src.vehicle_rental_system.utils.idempotency import IdempotencyCache
+from src.vehicle_rental_system.utils.search_index import SearchIndex, bounded_distance
+from src.vehicle_rental_system.utils.fleet_snapshot import (
+    FleetSnapshot,
+    json_to_snapshot,
+    snapshot_to_json,
+    write_snapshot,
+)
 
 
 class TestFileHandler:
@@ -48,6 +63,15 @@ class TestFileHandler:
         data = handler.read()
         assert data == []
 
+    def test_file_handler_defers_disk_access(self, tmp_path, monkeypatch):
+        """Test that constructing a handler touches nothing until first use."""
+        monkeypatch.chdir(tmp_path)
+        handler = FileHandler("nested/test.json")
+        assert not (tmp_path / "data").exists()
+
+        assert handler.read() == []
+        assert (tmp_path / "data" / "nested" / "test.json").exists()
+
     def test_file_handler_write_and_read(self, tmp_path, monkeypatch):
         """Test that FileHandler can write and read JSON data."""
         test_file = tmp_path / "test_data.json"
@@ -140,3 +164,461 @@ class TestHelpers:
         # Should not raise an exception
         pause()
 
+    def test_show_pages_prints_one_buffer_per_page(self, monkeypatch):
+        """Test that each page is a single print and later pages are not pulled."""
+        pulled = []
+
+        def rows():
+            for i in range(10):
+                pulled.append(i)
+                yield i
+
+        answers = iter(["", "q"])
+        monkeypatch.setattr("builtins.input", lambda _: next(answers))
+        printed = []
+        monkeypatch.setattr("builtins.print", lambda *args, **kwargs: printed.append(args[0]))
+
+        shown = show_pages("Rows:", rows(), lambda i: f"row {i}", page_size=3)
+
+        assert shown == 6
+        assert len(printed) == 2
+        assert printed[1] == "\nRows: (page 2)\nrow 3\nrow 4\nrow 5"
+        assert pulled == list(range(7))
+
+    def test_show_pages_reports_empty_results(self, monkeypatch, capsys):
+        """Test the empty message and that the last page waits for Enter."""
+        monkeypatch.setattr("builtins.input", lambda _: "")
+        assert show_pages("Rows:", [], str, empty="Nothing here.") == 0
+        assert show_pages("Rows:", [1, 2], str, page_size=5) == 2
+        assert capsys.readouterr().out == "Nothing here.\n\nRows:\n1\n2\n"
+
+
+
+class TestJsonArray:
+    """Test incremental scanning of top-level JSON arrays."""
+
+    def test_iter_elements_reports_exact_byte_spans(self, tmp_path):
+        """Test that every span slices back to its own record."""
+        path = tmp_path / "items.json"
+        items = [{"id": i, "name": "Škoda" if i % 2 else "Kia"} for i in range(50)]
+        path.write_text(json.dumps(items, indent=4, ensure_ascii=False), encoding="utf-8")
+        raw = path.read_bytes()
+
+        seen = []
+        for offset, length, value in iter_elements(path, chunk_size=7):
+            assert json.loads(raw[offset:offset + length]) == value
+            seen.append(value)
+        assert seen == items
+
+    def test_iter_elements_handles_empty_array(self, tmp_path):
+        """Test that an empty array yields nothing."""
+        path = tmp_path / "empty.json"
+        path.write_text("[]")
+        assert list(iter_elements(path)) == []
+
+    def test_iter_elements_rejects_truncated_file(self, tmp_path):
+        """Test that a truncated array raises ValueError."""
+        path = tmp_path / "broken.json"
+        path.write_text('[{"id": 1}, {"id": 2')
+        with pytest.raises(ValueError):
+            list(iter_elements(path))
+
+    def test_iter_items_reverse_spans_blocks(self, tmp_path):
+        """Test that reverse streaming yields every item back to front."""
+        path = tmp_path / "items.json"
+        path.write_text(json.dumps(list(range(25)), indent=4))
+
+        assert list(iter_items(path)) == list(range(25))
+        assert list(iter_items(path, reverse=True, block_size=4)) == list(range(24, -1, -1))
+
+    def test_append_element_matches_indented_dump(self, tmp_path):
+        """Test that in-place appends produce the same bytes as json.dump."""
+        path = tmp_path / "ledger.json"
+        path.write_text("[]")
+        items = [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": []}]
+        for item in items:
+            append_element(path, item)
+
+        assert path.read_text() == json.dumps(items, indent=4)
+
+
+class TestOffsetIndex:
+    """Test the mmap-backed vehicle offset index."""
+
+    def test_find_returns_first_position_for_key(self, tmp_path):
+        """Test lookups, misses and duplicate keys."""
+        path = tmp_path / "vehicles.json"
+        path.write_text(json.dumps([{"vehicle_id": v} for v in (5, 3, 9, 3)], indent=4))
+
+        index = OffsetIndex(path).open()
+        try:
+            assert len(index) == 4
+            assert index.find(9) == 2
+            assert index.find(3) == 1
+            assert index.find(4) is None
+        finally:
+            index.close()
+
+    def test_index_rebuilds_when_source_changes(self, tmp_path):
+        """Test that a stale index is detected and rebuilt on open."""
+        path = tmp_path / "vehicles.json"
+        path.write_text(json.dumps([{"vehicle_id": 1}]))
+        OffsetIndex(path).open().close()
+
+        path.write_text(json.dumps([{"vehicle_id": 1}, {"vehicle_id": 2}]))
+        index = OffsetIndex(path).open()
+        try:
+            assert index.find(2) == 1
+        finally:
+            index.close()
+
+
+class TestFleetSnapshot:
+    """Test the binary fleet snapshot format and its converters."""
+
+    @pytest.fixture
+    def fleet_records(self):
+        """Fixture providing vehicles.json-style records in non-sorted id order."""
+        return [
+            {"vehicle_id": 7, "type": "Truck", "brand": "Ford", "model": "F-150",
+             "base_price": 61500.0, "available": False},
+            {"vehicle_id": 2, "type": "Car", "brand": "Toyota", "model": "Corolla",
+             "base_price": 34560.0, "available": True},
+            {"vehicle_id": 4, "type": "Bike", "brand": "Yamaha", "model": "MT-07",
+             "base_price": 7600.0, "available": True},
+        ]
+
+    def test_json_round_trip_preserves_records_and_order(self, tmp_path, fleet_records):
+        """Test that JSON -> snapshot -> JSON is lossless."""
+        source = tmp_path / "vehicles.json"
+        source.write_text(json.dumps(fleet_records, indent=4))
+
+        json_to_snapshot(source, tmp_path / "vehicles.snap")
+        snapshot_to_json(tmp_path / "vehicles.snap", tmp_path / "out.json")
+
+        assert (tmp_path / "out.json").read_text() == source.read_text()
+
+    def test_find_and_flip_available_in_place(self, tmp_path, fleet_records):
+        """Test binary search lookups and persistent in-place flag updates."""
+        path = tmp_path / "vehicles.snap"
+        write_snapshot(fleet_records, path)
+        size = path.stat().st_size
+
+        with FleetSnapshot(path, writable=True) as snapshot:
+            position = snapshot.find(4)
+            assert snapshot.record(position)["model"] == "MT-07"
+            assert snapshot.find(3) is None
+            snapshot.set_available(position, False)
+            snapshot.flush()
+
+        with FleetSnapshot(path) as snapshot:
+            assert snapshot.is_available(snapshot.find(4)) is False
+        assert path.stat().st_size == size
+
+    def test_rejects_foreign_files(self, tmp_path):
+        """Test that a non-snapshot file is refused."""
+        path = tmp_path / "vehicles.snap"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            FleetSnapshot(path)
+
+
+class TestRentalArchive:
+    """Test the month-partitioned, compressed rental archive."""
+
+    @pytest.fixture
+    def archive(self, tmp_path, monkeypatch):
+        """Fixture creating an archive rooted in a temp data/ dir."""
+        monkeypatch.chdir(tmp_path)
+        return RentalArchive(codec="zlib")
+
+    @staticmethod
+    def entry(renter, when):
+        return {"renter": renter, "vehicle_id": 1, "days": 1, "cost": 100, "date": when}
+
+    def test_import_seals_old_months_and_keeps_current_hot(self, archive):
+        """Test that only the current month stays as plain JSON."""
+        today = datetime.today().isoformat()
+        archive.import_entries([
+            self.entry("A", "2024-01-05T10:00:00"),
+            self.entry("B", "2024-01-20T10:00:00"),
+            self.entry("C", "2024-03-02"),
+            self.entry("D", today),
+        ])
+
+        parts = archive.partitions
+        assert parts["2024-01"]["sealed"] and parts["2024-01"]["count"] == 2
+        assert parts["2024-01"]["file"].endswith(".json.z")
+        assert parts["2024-01"]["min_date"] == "2024-01-05T10:00:00"
+        assert not parts[RentalArchive.current_month()]["sealed"]
+        assert [e["renter"] for e in archive.load_hot()] == ["D"]
+
+    def test_range_reads_skip_non_overlapping_partitions(self, archive, monkeypatch):
+        """Test that a range query only opens partitions it needs."""
+        archive.import_entries([
+            self.entry("A", "2024-01-05"),
+            self.entry("B", "2024-02-10"),
+            self.entry("C", "2024-03-15"),
+        ])
+        opened = []
+        original = archive.read_partition
+        monkeypatch.setattr(archive, "read_partition", lambda m: opened.append(m) or original(m))
+
+        result = list(archive.iter_entries(start="2024-02-01", end=date(2024, 2, 28)))
+
+        assert [e["renter"] for e in result] == ["B"]
+        assert opened == ["2024-02"]
+
+    def test_date_only_string_end_covers_the_whole_day(self, archive):
+        """Test that end="YYYY-MM-DD" includes rentals made later that day, like a date does."""
+        archive.import_entries([
+            self.entry("A", "2024-03-30T09:00:00"),
+            self.entry("B", "2024-03-31T18:30:00"),
+            self.entry("C", "2024-04-01T08:00:00"),
+        ])
+
+        by_string = [e["renter"] for e in archive.iter_entries(end="2024-03-31")]
+        by_date = [e["renter"] for e in archive.iter_entries(end=date(2024, 3, 31))]
+
+        assert sorted(by_string) == sorted(by_date) == ["A", "B"]
+        assert sorted(e["renter"] for e in archive.iter_entries(start="2024-03-31T12:00:00")) == ["B", "C"]
+
+    def test_save_hot_spills_entries_from_a_finished_month(self, archive):
+        """Test that a month rollover seals the previous hot partition once."""
+        archive.import_entries([self.entry("A", "2024-01-05")])
+        hot = archive.save_hot([self.entry("B", "2024-01-06"), self.entry("C", datetime.today().isoformat())])
+
+        assert [e["renter"] for e in hot] == ["C"]
+        assert [e["renter"] for e in archive.read_partition("2024-01")] == ["A", "B"]
+
+
+class TestQueryCache:
+    """Test the generation-invalidated LRU query cache."""
+
+    def test_hits_misses_and_invalidation(self):
+        """Test that results are reused until the generation changes."""
+        cache = QueryCache(maxsize=4)
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+
+        assert cache.get_or_compute("q", compute) == 1
+        assert cache.get_or_compute("q", compute) == 1
+        cache.invalidate()
+        assert cache.get_or_compute("q", compute) == 2
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["generation"]) == (1, 2, 1)
+
+    def test_write_during_compute_is_not_masked(self):
+        """Test that a result computed across an invalidation is not served as fresh."""
+        cache = QueryCache()
+
+        def compute():
+            cache.invalidate()  # a write lands while the query runs
+            return "stale"
+
+        assert cache.get_or_compute("q", compute) == "stale"
+        assert cache.get_or_compute("q", lambda: "fresh") == "fresh"
+
+    def test_lru_eviction_respects_maxsize(self):
+        """Test that the least recently used key is evicted first."""
+        cache = QueryCache(maxsize=2)
+        cache.get_or_compute("a", lambda: "a")
+        cache.get_or_compute("b", lambda: "b")
+        cache.get_or_compute("a", lambda: "a")
+        cache.get_or_compute("c", lambda: "c")
+
+        assert cache.stats()["size"] == 2
+        assert cache.get_or_compute("a", lambda: "recomputed") == "a"
+        assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+
+class TestMetrics:
+    """Test the metrics registry and hot-path instrumentation."""
+
+    @pytest.fixture
+    def registry(self):
+        """Fixture enabling instrumentation on a private registry."""
+        registry = metrics.enable(metrics.Metrics())
+        yield registry
+        metrics.disable()
+
+    def test_prometheus_histogram_format(self):
+        """Test cumulative buckets, sum and count in the text export."""
+        registry = metrics.Metrics(buckets=(0.1, 1.0))
+        registry.observe("vrs_call_seconds", 0.05, method="x")
+        registry.observe("vrs_call_seconds", 0.5, method="x")
+        registry.inc("vrs_calls_total", method="x", outcome="ok")
+
+        text = registry.to_prometheus()
+        assert "# TYPE vrs_call_seconds histogram" in text
+        assert 'vrs_call_seconds_bucket{method="x",le="0.1"} 1' in text
+        assert 'vrs_call_seconds_bucket{method="x",le="1.0"} 2' in text
+        assert 'vrs_call_seconds_count{method="x"} 2' in text
+        assert 'vrs_calls_total{method="x",outcome="ok"} 1' in text
+
+    def test_file_handler_io_is_measured(self, registry, tmp_path):
+        """Test that reads/writes record latency, JSON time and byte counts."""
+        handler = FileHandler("metrics_test.json")
+        handler.path = tmp_path / "metrics_test.json"
+        registry.reset()  # ignore the constructor's bootstrap write
+        handler.write([{"id": 1}])
+        handler.read()
+
+        snap = registry.snapshot()
+        counters = {(c["name"], c["labels"]["file"]): c["value"] for c in snap["counters"]}
+        size = handler.path.stat().st_size
+        assert counters[("vrs_file_bytes_written_total", "metrics_test.json")] == size
+        assert counters[("vrs_file_bytes_read_total", "metrics_test.json")] == size
+        json_ops = {h["labels"]["operation"] for h in snap["histograms"] if h["name"] == "vrs_json_seconds"}
+        assert json_ops == {"encode", "decode"}
+
+    def test_generators_are_timed_over_their_iteration(self, registry, write_data):
+        """Test that paged listings are counted once they are consumed or abandoned."""
+        from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
+        write_data((1, 2, 3))
+        manager = VehicleManager()
+
+        assert len(list(manager.iter_vehicles(available=True))) == 3
+        first_page = manager.iter_vehicles()
+        next(first_page)
+        first_page.close()
+
+        calls = [c for c in registry.snapshot()["counters"]
+                 if c["name"] == "vrs_calls_total" and c["labels"]["method"] == "iter_vehicles"]
+        assert [(c["labels"]["outcome"], c["value"]) for c in calls] == [("ok", 2)]
+
+    def test_disable_restores_original_methods(self, registry):
+        """Test that disabling leaves no wrappers behind."""
+        from src.vehicle_rental_system.services.vehicle_manager import VehicleManager
+        original = VehicleManager.__dict__["list_available"].__wrapped__
+
+        metrics.disable()
+
+        assert VehicleManager.__dict__["list_available"] is original
+        assert not metrics.is_enabled()
+
+
+class TestSessionProfiler:
+    """Test the session profiler used by main.py --profile."""
+
+    def test_report_has_operations_memory_and_cprofile(self, tmp_path):
+        """Test a scripted workload produces a full report and .prof dump."""
+        report = tmp_path / "profile.txt"
+        with SessionProfiler(report) as profiler:
+            with profiler.operation("load", trace_memory=True):
+                data = [{"id": i} for i in range(10000)]
+            with profiler.operation("query"):
+                sorted(data, key=lambda d: -d["id"])
+
+        text = report.read_text()
+        summary = profiler.summary()
+        assert summary["load"]["peak"] > 0
+        assert summary["query"]["peak"] is None
+        assert "load" in text and "query" in text
+        assert "cumulative" in text
+        assert (tmp_path / "profile.prof").exists()
+
+    def test_input_wait_is_excluded_from_wall_time(self, tmp_path, monkeypatch):
+        """Test that time blocked on input() is reported separately."""
+        import time as time_module
+        monkeypatch.setattr("builtins.input", lambda *_: time_module.sleep(0.05) or "")
+
+        profiler = SessionProfiler(tmp_path / "p.txt", operations={"menu 5"})
+        profiler.start()
+        with profiler.operation("menu 5"):
+            input("Press Enter")
+        profiler.stop()
+
+        row = profiler.summary()["menu 5"]
+        assert row["waiting"] >= 0.05
+        assert row["wall"] < 0.05
+
+    def test_nested_selected_operations_keep_profiling(self, tmp_path):
+        """Test that an inner selected operation does not switch off the outer one."""
+        profiler = SessionProfiler(tmp_path / "p.txt", operations={"load", "menu 1"})
+        profiler.start()
+        with profiler.operation("menu 1"):
+            with profiler.operation("load"):
+                pass
+            assert profiler._profiling
+        assert not profiler._profiling
+        profiler.stop()
+
+
+class TestSearchIndex:
+    """Test the trie/trigram brand and model search index."""
+
+    @pytest.fixture
+    def index(self):
+        """Fixture indexing a small fleet."""
+        from src.vehicle_rental_system.models.car import Car
+        fleet = [
+            Car(1, "Toyota", "Corolla", 100),
+            Car(2, "Toyota", "Land Cruiser", 300),
+            Car(3, "Honda", "Civic", 120, available=False),
+            Car(4, "Tesla", "Model 3", 400),
+        ]
+        return SearchIndex(fleet)
+
+    def test_bounded_distance(self):
+        """Test the banded edit distance and its early exit."""
+        assert bounded_distance("corola", "corolla", 2) == 1
+        assert bounded_distance("kitten", "sitting", 3) == 3
+        assert bounded_distance("kitten", "sitting", 2) is None
+        assert bounded_distance("abc", "abc", 0) == 0
+
+    def test_prefix_completion(self, index):
+        """Test trie completion returns shortest terms first."""
+        assert index.complete("t") == ["tesla", "toyota"]
+        assert index.complete("cr") == ["cruiser"]
+        assert index.complete("x") == []
+
+    def test_search_by_prefix_and_words(self, index):
+        """Test that every query word must match a term prefix."""
+        assert [v.vehicle_id for v in index.search("toy")] == [1, 2]
+        assert [v.vehicle_id for v in index.search("toyota cruis")] == [2]
+        assert [v.vehicle_id for v in index.search("CIVIC")] == [3]
+
+    def test_fuzzy_fallback_and_filters(self, index):
+        """Test typo tolerance, availability filtering and limits."""
+        assert [v.vehicle_id for v in index.search("corola")] == [1]
+        assert [v.vehicle_id for v in index.search("hnda")] == [3]
+        assert index.search("hnda", fuzzy=False) == []
+        assert index.search("civic", available=True) == []
+        assert len(index.search("toyota", limit=1)) == 1
+
+
+class TestIdempotencyCache:
+    """Test the bounded, expiring idempotency key cache."""
+
+    def test_entries_expire_after_ttl(self):
+        """Test that keys are forgotten once their ttl has passed."""
+        now = [100.0]
+        cache = IdempotencyCache(ttl=10, clock=lambda: now[0])
+        cache.store("k", ("rent", "A", "1", 2), "ok")
+
+        assert cache.lookup("k") == (("rent", "A", "1", 2), "ok")
+        now[0] = 110.0
+        assert cache.lookup("k") is None
+        assert len(cache) == 0
+
+    def test_oldest_entries_are_dropped_beyond_maxsize(self):
+        """Test that the cache never grows past maxsize."""
+        cache = IdempotencyCache(maxsize=2)
+        for key in ("a", "b", "c"):
+            cache.store(key, ("return", key), key)
+
+        assert cache.lookup("a") is None
+        assert cache.lookup("c") == (("return", "c"), "c")
+
+    def test_records_round_trip(self):
+        """Test that saved records restore the same entries."""
+        cache = IdempotencyCache()
+        cache.store("k", ("return", "3"), "done")
+        records = json.loads(json.dumps(cache.records()))
+
+        restored = IdempotencyCache()
+        restored.load(records)
+        assert restored.lookup("k") == (("return", "3"), "done")
+        assert not restored.dirty